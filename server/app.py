@@ -1,14 +1,34 @@
 #!/usr/bin/env python3
+import logging
+import math
 import os
 from flask import Flask, jsonify  # ✅ Import jsonify here
 from flask_migrate import Migrate
 from flask_restful import Api, Resource, request  # ✅ Import Resource here
 from flask_cors import CORS
-from models import db, Game, Player, PlayerGame, Category, Country
+from werkzeug.middleware.proxy_fix import ProxyFix
+from config import BASE_DIR, DATABASE, engine_options
+from database import retry_on_lock
+from models import db, Game, Player, PlayerGame, Category, Country, hash_password
+from queries import (player_listing, requested_sort, player_library_query, PLAYER_LIBRARY_SORTS,
+                     country_players_query)
+from serializers import game_schema, player_schema, country_schema, player_library_schema, country_detail
+from pagination import paginate_rows, page_headers, get_limit, encode_cursor, decode_cursor, Page
+from streaming import wants_stream, stream_rows
+from json_provider import get_json_provider_class, output_json
+from leaderboards import Leaderboards
+import reads
+from reads import run
+from cache import ResponseCache
+from versioning import conditional
+from bulk import read_items, create_games, create_player_games
+from instrumentation import RequestMetrics
+from rate_limit import LoginLimiter
+from logging_config import configure_logging
+from search import search, include_object, KINDS
+from recommendations import Recommender
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 
-BASE_DIR = os.path.abspath(os.path.dirname(__file__))
-DATABASE = os.environ.get("DB_URI", f"sqlite:///{os.path.join(BASE_DIR, 'app.db')}")
 
 app = Flask(__name__)
 
@@ -16,7 +36,9 @@ app = Flask(__name__)
 CORS(app)
 app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-app.json.compact = False
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(DATABASE)
+# orjson when installed, stdlib otherwise; output is only indented in debug mode
+app.json = get_json_provider_class(os.environ.get("JSON_PROVIDER"))(app)
 
 # Enable CORS for specific routes (e.g., /api/*)
 CORS(app, resources={r"/api/*": {"origins": "*"}})
@@ -26,48 +48,82 @@ app.config["JWT_SECRET_KEY"] = os.environ.get("JWT_SECRET_KEY", "123456")  # Add
 jwt = JWTManager(app)
 
 # Initialize database and migrations
-migrate = Migrate(app, db)
+migrate = Migrate(app, db, include_object=include_object)
 db.init_app(app)
 
+# Precomputed top-N rankings
+app.config["LEADERBOARD_SIZE"] = int(os.environ.get("LEADERBOARD_SIZE", 10))
+app.config["LEADERBOARD_REFRESH_SECONDS"] = float(os.environ.get("LEADERBOARD_REFRESH_SECONDS", 60))
+# Rebuilds run in the background after this delay, so a burst of writes costs one
+app.config["LEADERBOARD_DEBOUNCE_SECONDS"] = float(os.environ.get("LEADERBOARD_DEBOUNCE_SECONDS", 1.0))
+leaderboards = Leaderboards(app)
+
+# Read-through cache for catalog GETs, invalidated when writes commit
+app.config["CACHE_ENABLED"] = os.environ.get("CACHE_ENABLED", "1") == "1"
+app.config["CACHE_TTL"] = int(os.environ.get("CACHE_TTL", 60))
+app.config["CACHE_BACKEND"] = os.environ.get("CACHE_BACKEND", "memory")
+app.config["CACHE_REDIS_URL"] = os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/0")
+response_cache = ResponseCache(app)
+
+# Item-item recommendation model, built offline by recommendations.py and memory-mapped here
+app.config["RECOMMENDER_DIR"] = os.environ.get("RECOMMENDER_DIR", os.path.join(BASE_DIR, "recommender"))
+app.config["RECOMMENDER_RELOAD_SECONDS"] = float(os.environ.get("RECOMMENDER_RELOAD_SECONDS", 60))
+recommender = Recommender(app)
+
+# Per-request query/DB/serialization timings, /metrics and the slow-query log
+app.config["SLOW_QUERY_MS"] = float(os.environ.get("SLOW_QUERY_MS", 100))
+request_metrics = RequestMetrics(app)
+
+# Password hashing parameters (werkzeug method string, e.g. "scrypt" or
+# "pbkdf2:sha256:600000"); existing hashes are upgraded on the next login
+app.config["PASSWORD_HASH_METHOD"] = os.environ.get("PASSWORD_HASH_METHOD")
+
+# Token buckets in front of the password check. They are per worker process:
+# with N workers the effective limits are up to N times these values
+app.config["LOGIN_USERNAME_BURST"] = int(os.environ.get("LOGIN_USERNAME_BURST", 5))
+app.config["LOGIN_USERNAME_PER_SECOND"] = float(os.environ.get("LOGIN_USERNAME_PER_SECOND", 5 / 60))
+app.config["LOGIN_IP_BURST"] = int(os.environ.get("LOGIN_IP_BURST", 20))
+app.config["LOGIN_IP_PER_SECOND"] = float(os.environ.get("LOGIN_IP_PER_SECOND", 1.0))
+login_limiter = LoginLimiter(app)
+
+# The IP bucket keys on request.remote_addr. Behind a reverse proxy that is the
+# proxy's address, so set PROXY_FIX_HOPS to the number of proxies in front of
+# the app to take the client address from X-Forwarded-For instead. Only do so
+# behind a proxy that sets the header, or clients can pick their own address
+app.config["PROXY_FIX_HOPS"] = int(os.environ.get("PROXY_FIX_HOPS", 0))
+if app.config["PROXY_FIX_HOPS"]:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config["PROXY_FIX_HOPS"],
+                            x_proto=app.config["PROXY_FIX_HOPS"])
+request_metrics.add_collector(login_limiter.metrics_lines)
+
+# Structured JSON logs written by a background thread, with secrets redacted
+app.config["LOG_LEVEL"] = os.environ.get("LOG_LEVEL", "INFO")
+app.config["LOG_SAMPLE_RATE"] = float(os.environ.get("LOG_SAMPLE_RATE", 1.0))
+app.config["LOG_REQUESTS"] = os.environ.get("LOG_REQUESTS", "1") == "1"
+app.config["LOG_ASYNC"] = os.environ.get("LOG_ASYNC", "1") == "1"
+configure_logging(app)
+logger = logging.getLogger('app.auth')
+
 # Initialize API
-api = Api(app)
+api = Api(app, decorators=[retry_on_lock])
+api.representation('application/json')(output_json)
+
+def serve(read):
+    """A Resource ``get`` that answers with the shared ``read``, behind its ETag and the response cache."""
+    @conditional(*read.tables)
+    @response_cache.cached(read.namespace, read.id_arg, read.tables)
+    def get(resource, **kwargs):
+        return run(read.steps(**kwargs))
+    return get
+
 
 @app.route("/")
 def index():
     return "<h1>Hi Welcome</h1>"
 
 
-
 class GameResource(Resource):
-    def get(self, game_id=None):
-        try:
-            if game_id:
-                # Retrieve a single game by ID
-                game = Game.query.get(game_id)
-                if game:
-                    return {  # ✅ Return a dictionary (Flask-Restful auto-serializes it)
-                        'game_id': game.game_id,
-                        'title': game.title,
-                        'release_year': game.release_year,
-                        'photo_url': game.photo_url,
-                        'category': game.category.category_name if game.category else None
-                    }, 200
-                return {"message": "Game not found"}, 404  # ✅ Dict + Status Code
-
-            else:
-                # Retrieve all games if no game_id is provided
-                games = Game.query.all()
-                return [{
-                    'game_id': game.game_id,
-                    'title': game.title,
-                    'release_year': game.release_year,
-                    'photo_url': game.photo_url,
-                    'category': game.category.category_name if game.category else None
-                } for game in games], 200  # ✅ List of dictionaries
-
-        except Exception as e:
-            return {"error": str(e)}, 500  # ✅ Dict + Status Code
-
+    get = serve(reads.games)
 
     def post(self):
         """Create a new game."""
@@ -120,32 +176,7 @@ class GameResource(Resource):
 
 
 class CategoryResource(Resource):
-    def get(self, category_id=None):
-        """Retrieve a specific category by its ID or all categories."""
-        if category_id:
-            # Retrieve a single category by ID
-            category = Category.query.get(category_id)
-            if category:
-                # Get all games that belong to this category
-                games = Game.query.filter_by(category_id=category_id).all()
-                return jsonify({
-                    'category_id': category.category_id,
-                    'category_name': category.category_name,
-                    'games': [{
-                        'game_id': game.game_id,
-                        'title': game.title,
-                        'release_year': game.release_year,
-                        'photo_url': game.photo_url
-                    } for game in games]
-                })
-            return jsonify({'message': 'Category not found'}), 404
-        else:
-            # Retrieve all categories if no category_id is provided
-            categories = Category.query.all()
-            return jsonify([{
-                'category_id': category.category_id,
-                'category_name': category.category_name
-            } for category in categories])
+    get = serve(reads.categories)
 
     def post(self):
         """Create a new category."""
@@ -179,6 +210,7 @@ class CategoryResource(Resource):
         if not category:
             return jsonify({'message': 'Category not found'}), 404
 
+        # Its games and their reviews go with it through ON DELETE CASCADE
         db.session.delete(category)
         db.session.commit()
         return jsonify({'message': 'Category deleted successfully!'})
@@ -189,41 +221,36 @@ class CategoryResource(Resource):
 
 
 from flask import request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
 
 class PlayerResource(Resource):
     def get(self, player_id=None):
     
      if player_id:
         # Retrieve a specific player by ID
-        player = Player.query.get(player_id)
+        player = db.session.execute(player_schema.select().where(Player.player_id == player_id)).first()
         if not player:
             return jsonify({'message': 'Player not found'}), 404
         
         # Return player details including password_hash
-        return jsonify({
-            'player_id': player.player_id,
-            'username': player.username,
-            'email': player.email,
-            'country': player.country.country_name,
-            'password_hash': player.password_hash  # Optional: include password_hash
-        })
+        return jsonify(player_schema.mapper()(player))
      else:
         # Retrieve all players
-        players = Player.query.all()
+        listed = player_listing.query()
+        if wants_stream():
+            return stream_rows(listed.query, Player.player_id, listed.serialize, listed.sort, listed.descending)
+
+        page = paginate_rows(db.session, listed.query, Player.player_id, listed.sort, listed.descending)
+        players = page.items
         if not players:
             return jsonify({'message': 'No players found'}), 404
         
         # Return player details including password_hash
-        players_data = [{
-            'player_id': player.player_id,
-            'username': player.username,
-            'email': player.email,
-            'country': player.country.country_name,
-            'password_hash': player.password_hash  # Optional: include password_hash
-        } for player in players]
+        players_data = [listed.serialize(player) for player in players]
         
-        return jsonify(players_data)
+        response = jsonify(players_data)
+        response.headers.update(page_headers(page))
+        return response
 
 
     def post(self):
@@ -240,7 +267,7 @@ class PlayerResource(Resource):
             return jsonify({'message': 'Username or email already taken'}), 400
 
         # Hash the password before storing it
-        hashed_password = generate_password_hash(data['password'])
+        hashed_password = hash_password(data['password'])
 
         # Create new player with hashed password
         new_player = Player(
@@ -272,7 +299,7 @@ class PlayerResource(Resource):
             player.country_id = data['country_id']
         if 'password' in data:  # If password is being updated
             # Hash the new password
-            player.password_hash = generate_password_hash(data['password'])
+            player.password_hash = hash_password(data['password'])
         
         # Commit the changes
         db.session.commit()
@@ -281,30 +308,7 @@ class PlayerResource(Resource):
 
     
 class CountryResource(Resource):
-    def get(self, country_id=None):
-        if country_id:
-            country = Country.query.get(country_id)
-            if not country:
-                return jsonify({'message': 'Country not found'}), 404
-
-            # Retrieve all players associated with this country
-            players = [{'player_id': player.player_id, 'username': player.username} for player in country.players]
-
-            return jsonify({
-                'country_id': country.country_id,
-                'country_name': country.country_name,
-                'players': players  # Include players in the response
-            })
-
-        # Retrieve all countries (if no country_id is provided)
-        countries = Country.query.all()
-        if not countries:
-            return jsonify({'message': 'No countries found'}), 404
-
-        return jsonify({'countries': [  # Corrected indentation here
-            {'country_id': country.country_id, 'country_name': country.country_name}
-            for country in countries
-        ]})
+    get = serve(reads.countries)
 
     def post(self):
         """Create a new country."""
@@ -332,47 +336,18 @@ class CountryResource(Resource):
     
 class CountryPlayersResource(Resource):
     def get(self, country_id):
-        """Retrieve all players of a specific country"""
-        country = Country.query.get(country_id)
+        """Retrieve the players of a specific country, one page at a time"""
+        country = db.session.execute(country_schema.select().where(Country.country_id == country_id)).first()
         if not country:
             return jsonify({'message': 'Country not found'}), 404
 
-        players = [{'player_id': player.player_id, 'username': player.username} for player in country.players]
-        return jsonify({'country_id': country.country_id, 'country_name': country.country_name, 'players': players})
+        page = paginate_rows(db.session, country_players_query(country_id), Player.player_id)
+        response = jsonify(country_detail(country, page.items))
+        response.headers.update(page_headers(page))
+        return response
 
 class PlayerGameResource(Resource):
-    
-    # Get a specific player-game relationship or all player-game relationships
-    def get(self, player_game_id=None):
-        if player_game_id:
-            # Retrieve a single player-game relationship by player_game_id
-            player_game = PlayerGame.query.get(player_game_id)
-            if not player_game:
-                return jsonify({'message': 'PlayerGame not found'}), 404
-            
-            # Return the details of the player-game relationship
-            return jsonify({
-                'id': player_game.id,
-                'game': player_game.game.title,
-                'player': player_game.player.username,
-                'review': player_game.review,
-                'rating': player_game.rating
-            })
-        
-        # Retrieve all player-game relationships if no player_game_id is provided
-        player_games = PlayerGame.query.all()
-        if not player_games:
-            return jsonify({'message': 'No player-game relationships found'}), 404
-        
-        # Return all player-game relationships
-        return jsonify([{
-            'id': player_game.id,
-            'game': player_game.game.title,
-            'player': player_game.player.username,
-            'review': player_game.review,
-            'rating': player_game.rating
-        } for player_game in player_games])
-    
+    get = serve(reads.player_games)
 
     # Create a new player-game relationship
     def post(self):
@@ -381,6 +356,11 @@ class PlayerGameResource(Resource):
         # Validate incoming data
         if not data or 'game_id' not in data or 'player_id' not in data:
             return jsonify({'message': 'Missing required fields (game_id, player_id)'}), 400
+
+        # A player can only review a game once
+        existing = PlayerGame.query.filter_by(player_id=data['player_id'], game_id=data['game_id']).first()
+        if existing:
+            return {'message': 'Player has already reviewed this game', 'id': existing.id}, 400
         
         # Create the new player-game relationship
         new_player_game = PlayerGame(
@@ -419,46 +399,20 @@ class PlayerGameResource(Resource):
         # Return success message
         return jsonify({'message': 'PlayerGame updated successfully!'})
     
-from flask import request
-from flask_restful import Resource
-from models import Game, Player  # Ensure you import the models appropriately
-
 class PlayerGamesResource(Resource):
     def get(self, player_id):
-        # Retrieve the player from the database
-        player = Player.query.get(player_id)
-        if not player:
-            return {'message': 'Player not found'}, 404
-
-        # Retrieve games associated with the player (adjust based on your model)
-        games = Game.query.filter_by(player_id=player_id).all()
-
-        # If no games are found for the player
-        if not games:
+        """The games a player has reviewed, with their category, one page at a time."""
+        sort, descending = requested_sort(PLAYER_LIBRARY_SORTS, 'id')
+        page = paginate_rows(db.session, player_library_query(player_id), PlayerGame.id, sort, descending)
+
+        if not page.items:
+            # Only look the player up when there is nothing to show
+            if not db.session.get(Player, player_id):
+                return {'message': 'Player not found'}, 404
             return {'message': 'No games found for this player'}, 404
 
-        # Format the list of games to return as JSON
-        games_data = [{'game_id': game.id, 'name': game.name, 'genre': game.genre} for game in games]
-
-        return {'games': games_data}, 200
-
-class PlayerGamesListResource(Resource):
-    def get(self, player_id):
-        # Retrieve all PlayerGame entries associated with the given player_id
-        player_games = PlayerGame.query.filter_by(player_id=player_id).all()
-
-        if not player_games:
-            return jsonify({'message': 'No games found for this player'}), 404
-        
-        # Get the games associated with the player through PlayerGame
-        return jsonify([{
-            'game': player_game.game.title,
-            'review': player_game.review,
-            'rating': player_game.rating
-        } for player_game in player_games])
-
-# Add the resource to the API with the URL structure: /player/<player_id>/games
-api.add_resource(PlayerGamesListResource, '/player/<int:player_id>/games')
+        serialize = player_library_schema.mapper()
+        return [serialize(row) for row in page.items], 200, page_headers(page)
 
 
 from flask import request, jsonify
@@ -468,38 +422,55 @@ from models import Player  # Adjust the import path as necessary
 
 class LoginResource(Resource):
     def post(self):
-        data = request.get_json()
+        data = request.get_json(silent=True)
 
         # Validate required fields
         required_fields = ['username', 'password']
-        if not all(field in data for field in required_fields):
+        if not isinstance(data, dict) or not all(field in data for field in required_fields):
             return {'message': 'Missing fields'}, 400
 
         username = data['username']
         password = data['password']
+        if not isinstance(username, str) or not isinstance(password, str):
+            return {'message': 'username and password must be strings'}, 400
+
+        # Throttle before doing any hashing work
+        retry_after = login_limiter.check(username, request.remote_addr or '')
+        if retry_after:
+            login_limiter.record('limited')
+            return {'message': 'Too many login attempts'}, 429, {'Retry-After': str(math.ceil(retry_after))}
 
         # Retrieve player by username
         player = Player.query.filter_by(username=username).first()
         if not player:
-            print(f"Player not found: {username}")
+            logger.info('login failed', extra={'fields': {'username': username, 'reason': 'unknown user'}})
+            login_limiter.record('invalid')
             return {'message': 'Invalid username or password'}, 401
 
         # Check if the password matches
         if not player.check_password(password):
-            print(f"Invalid password for player: {username}")
+            logger.info('login failed', extra={'fields': {'username': username, 'reason': 'wrong password'}})
+            login_limiter.record('invalid')
             return {'message': 'Invalid username or password'}, 401
 
+        # Upgrade the stored hash if the configured parameters changed
+        if player.needs_rehash():
+            player.set_password(password)
+            db.session.commit()
+            login_limiter.record('rehashed')
+        login_limiter.succeeded(username)
+        login_limiter.record('success')
+
         try:
             # Create access token
             access_token = create_access_token(identity=player.player_id)
-            print(f"Access token created: {access_token}")
 
             # Ensure player data is being passed
             user_data = {
                 'username': player.username,
                 'email': player.email,  # Adjust based on your Player model
             }
-            print(f"User data: {user_data}")
+            logger.info('login succeeded', extra={'fields': {'player_id': player.player_id, 'username': player.username}})
 
             # Return success response with user data and token
             return {
@@ -507,10 +478,94 @@ class LoginResource(Resource):
                 'access_token': access_token
             }, 200
         except Exception as e:
-            print(f"Error generating token: {str(e)}")
+            logger.exception('error generating token', extra={'fields': {'player_id': player.player_id}})
             return {'message': f'Error generating token: {str(e)}'}, 500
 
 
+class GameBulkResource(Resource):
+    def post(self):
+        """Create many games in one transaction."""
+        result = create_games(read_items())
+        return result, 201 if not result['failed'] else 207
+
+
+class PlayerGameBulkResource(Resource):
+    def post(self):
+        """Create many player-game reviews in one transaction."""
+        result = create_player_games(read_items())
+        if result['created']:
+            leaderboards.invalidate()
+        return result, 201 if not result['failed'] else 207
+
+
+class TopGamesResource(Resource):
+    def get(self):
+        """Top rated games across all categories."""
+        return {'games': leaderboards.top_games()}, 200
+
+
+class CategoryTopGamesResource(Resource):
+    def get(self, category_id):
+        """Top rated games in one category."""
+        if not db.session.get(Category, category_id):
+            return {'message': 'Category not found'}, 404
+        return {'category_id': category_id, 'games': leaderboards.top_games_in_category(category_id)}, 200
+
+
+class CountryTopPlayersResource(Resource):
+    def get(self, country_id):
+        """Players with the most reviews in one country."""
+        if not db.session.get(Country, country_id):
+            return {'message': 'Country not found'}, 404
+        return {'country_id': country_id, 'players': leaderboards.top_players_in_country(country_id)}, 200
+
+
+class PlayerRecommendationsResource(Resource):
+    def get(self, player_id):
+        """Games the player has not rated yet, best predicted first."""
+        if not db.session.get(Player, player_id):
+            return {'message': 'Player not found'}, 404
+        limit = request.args.get('limit', 10, type=int)
+        if limit < 1:
+            return {'message': 'limit must be a positive integer'}, 400
+
+        model, picks = recommender.for_player(player_id, min(limit, 100))
+        if model is None:
+            return {'message': 'Recommendations have not been built yet'}, 503
+        fields = ('game_id', 'title', 'category')
+        rows = db.session.execute(game_schema.select(fields).where(Game.game_id.in_([game_id for game_id, _ in picks])))
+        serialize = game_schema.mapper(fields)
+        games = {row.game_id: serialize(row) for row in rows}
+        return {
+            'player_id': player_id,
+            'model_built_at': model.meta['built_at'],
+            'recommendations': [
+                {**games[game_id], 'score': score}
+                for game_id, score in picks if game_id in games  # games deleted since the build are skipped
+            ]
+        }, 200
+
+
+class SearchResource(Resource):
+    def get(self):
+        """Ranked full-text search over games, categories, players and reviews."""
+        query = request.args.get('q', '').strip()
+        if not query:
+            return {'message': 'q is required'}, 400
+        kind = request.args.get('type')
+        if kind and kind not in KINDS:
+            return {'message': f"type must be one of {', '.join(KINDS)}"}, 400
+        limit = get_limit()
+        cursor = request.args.get('cursor')
+        offset = decode_cursor(cursor) if cursor else 0
+
+        # Ranked results have no stable key to seek on, so the cursor carries an offset
+        hits = search(query, kind, limit + 1, offset)
+        next_cursor = encode_cursor(offset + limit) if len(hits) > limit else None
+        page = Page(hits[:limit], next_cursor)
+        return {'query': query, 'results': page.items}, 200, page_headers(page)
+
+
 # Adding the Login route to the API
 api.add_resource(LoginResource, '/login')
 
@@ -519,8 +574,15 @@ api.add_resource(GameResource, '/games', '/games/<int:game_id>')
 api.add_resource(PlayerResource, '/players', '/players/<int:player_id>')
 # api.add_resource(GameResource, '/players/<int:player_id>/games')
 api.add_resource(CategoryResource, '/categories', '/categories/<int:category_id>')
-# api.add_resource(PlayerGamesListResource, '/player/<int:player_id>/games')
 api.add_resource(CountryResource, '/countries', '/countries/<int:country_id>')
 api.add_resource(CountryPlayersResource, '/countries/<int:country_id>/players')
 api.add_resource(PlayerGameResource, '/player_games', '/player_games/<int:player_game_id>')
-# api.add_resource(PlayerGamesResource, '/players/<int:player_id>/games')
+# /player/<id>/games is the original path, kept for existing clients
+api.add_resource(PlayerGamesResource, '/players/<int:player_id>/games', '/player/<int:player_id>/games')
+api.add_resource(GameBulkResource, '/games/bulk')
+api.add_resource(PlayerGameBulkResource, '/player_games/bulk')
+api.add_resource(TopGamesResource, '/leaderboards/games')
+api.add_resource(CategoryTopGamesResource, '/leaderboards/categories/<int:category_id>/games')
+api.add_resource(CountryTopPlayersResource, '/leaderboards/countries/<int:country_id>/players')
+api.add_resource(SearchResource, '/search')
+api.add_resource(PlayerRecommendationsResource, '/players/<int:player_id>/recommendations')
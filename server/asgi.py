@@ -0,0 +1,18 @@
+"""Async entry point: the read endpoints run on an event loop, the rest through Flask.
+
+    cd server && uvicorn asgi:application --workers 4
+
+or under gunicorn's process management:
+
+    cd server && gunicorn asgi:application -k uvicorn.workers.UvicornWorker
+
+See async_reads.py for which endpoints are served natively.
+"""
+from app import app
+from async_reads import AsyncReads
+
+application = AsyncReads(app)
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(application, host="0.0.0.0", port=5555)
@@ -0,0 +1,192 @@
+"""Read endpoints served on an asyncio event loop.
+
+``AsyncReads`` is an ASGI app. It answers GET requests for games, categories,
+countries and player games itself, using SQLAlchemy's asyncio engine, so a
+request waiting on the database holds no thread. Every other request goes to
+the Flask app through asgiref's WSGI adapter.
+
+The endpoints are the ones in reads.py, which the Flask resources serve
+too: only the I/O differs, and the response cache and ETags are shared.
+Flask's request context is pushed around each one, so ``request.args`` and
+the app's before/after request hooks (CORS, metrics, request log) behave
+as usual.
+"""
+import asyncio
+import contextvars
+import functools
+import re
+from asgiref.wsgi import WsgiToAsgi
+from flask import Response, current_app
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.exceptions import HTTPException
+from app import response_cache
+from config import async_database_uri, engine_options
+from database import apply_sqlite_pragmas
+from pagination import ordering
+import reads
+from streaming import wants_stream, NDJSON_MIMETYPE, STREAM_BATCH_SIZE
+from versioning import request_versions, versions_query, versions_token, validators, not_modified, set_validators
+
+
+class StreamedRows(Response):
+    """An NDJSON response whose lines come from an async generator."""
+
+    def __init__(self, rows):
+        super().__init__(mimetype=NDJSON_MIMETYPE)
+        self.rows = rows
+
+
+class AsyncReads:
+    ROUTES = [
+        (r'/games', reads.games),
+        (r'/games/(?P<game_id>\d+)', reads.games),
+        (r'/categories', reads.categories),
+        (r'/categories/(?P<category_id>\d+)', reads.categories),
+        (r'/countries', reads.countries),
+        (r'/countries/(?P<country_id>\d+)', reads.countries),
+        (r'/player_games', reads.player_games),
+        (r'/player_games/(?P<player_game_id>\d+)', reads.player_games),
+    ]
+
+    def __init__(self, app):
+        self.app = app
+        self.fallback = WsgiToAsgi(app)
+        self.routes = [(re.compile(pattern + '/?'), read) for pattern, read in self.ROUTES]
+
+        uri = async_database_uri(app.config['SQLALCHEMY_DATABASE_URI'])
+        self.engine = create_async_engine(uri, **engine_options(uri))
+        if self.engine.dialect.name == 'sqlite':
+            event.listen(self.engine.sync_engine, 'connect',
+                         lambda dbapi_connection, connection_record: apply_sqlite_pragmas(dbapi_connection))
+        self.session = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        read, kwargs = self._match(scope)
+        if read is None:
+            return await self.fallback(scope, receive, send)
+
+        with self._request_context(scope):
+            response = self.app.preprocess_request()
+            if response is None:
+                async with self.session() as session:
+                    try:
+                        response = await self._serve(session, read, **kwargs)
+                    except HTTPException as error:
+                        response = self._json(getattr(error, 'data', None) or {'message': error.description},
+                                              error.code)
+                    response = self.app.process_response(response)
+                    # The stream reads from the session, so send it before closing
+                    await self._send(response, send)
+                    return
+            await self._send(self.app.process_response(self.app.make_response(response)), send)
+
+    def _match(self, scope):
+        if scope['type'] != 'http' or scope['method'] != 'GET':
+            return None, None
+        for pattern, read in self.routes:
+            match = pattern.fullmatch(scope['path'])
+            if match:
+                return read, {key: int(value) for key, value in match.groupdict().items()}
+        return None, None
+
+    def _request_context(self, scope):
+        headers = [(name.decode('latin-1'), value.decode('latin-1')) for name, value in scope['headers']]
+        return self.app.test_request_context(
+            scope['path'],
+            query_string=scope['query_string'].decode('latin-1'),
+            headers=headers,
+            method=scope['method'],
+            url_scheme=scope.get('scheme', 'http'),
+        )
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _send(self, response, send):
+        headers = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                   for name, value in response.headers.items()]
+        await send({'type': 'http.response.start', 'status': response.status_code, 'headers': headers})
+        if not isinstance(response, StreamedRows):
+            await send({'type': 'http.response.body', 'body': response.get_data()})
+            return
+        async for line in response.rows:
+            await send({'type': 'http.response.body', 'body': line.encode(), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    def _json(self, data, status=200, headers=None):
+        response = current_app.json.response(data)
+        response.status_code = status
+        response.headers.extend(headers or {})
+        return response
+
+    async def _conditional(self, session, tables, get):
+        # Same validators as versioning.conditional, read through the async session
+        if wants_stream():
+            return await get()
+        etag, last_modified = validators(await self._versions(session, tables), tables)
+        if not_modified(etag, last_modified):
+            return set_validators(Response(status=304), etag, last_modified)
+        response = await get()
+        if response.status_code != 200:
+            return response
+        return set_validators(response, etag, last_modified)
+
+    async def _versions(self, session, tables):
+        # versioning.table_versions, read through the async session
+        read = request_versions()
+        if tables not in read:
+            read[tables] = (await session.execute(versions_query(tables))).all()
+        return read[tables]
+
+    async def _cached(self, session, namespace, item_id, tables, get):
+        if not response_cache.enabled or wants_stream():
+            return await get()
+        versions = versions_token(await self._versions(session, tables), tables)
+        key, response = await self._cache_call(response_cache.lookup, namespace, item_id, versions)
+        if response is not None:
+            return response
+        return await self._cache_call(response_cache.store, key, await get())
+
+    async def _cache_call(self, method, *args):
+        # Redis calls block, so they run on the default executor; the copied
+        # context carries Flask's request over for the cache key
+        if not response_cache.backend.blocking:
+            return method(*args)
+        call = functools.partial(contextvars.copy_context().run, method, *args)
+        return await asyncio.get_running_loop().run_in_executor(None, call)
+
+    async def _serve(self, session, read, **kwargs):
+        async def get():
+            return await self._run(session, read.steps(**kwargs))
+
+        return await self._conditional(session, read.tables, lambda: self._cached(
+            session, read.namespace, kwargs.get(read.id_arg), read.tables, get))
+
+    async def _run(self, session, steps):
+        # reads.run, executed on the async session
+        try:
+            statement = next(steps)
+            while True:
+                statement = steps.send((await session.execute(statement)).all())
+        except StopIteration as done:
+            result = done.value
+        if isinstance(result, reads.Stream):
+            return StreamedRows(self._stream(session, result))
+        return self._json(*result)
+
+    async def _stream(self, session, stream):
+        statement = (stream.query.order_by(*ordering(stream.key, stream.sort, stream.descending))
+                     .execution_options(yield_per=STREAM_BATCH_SIZE))
+        dumps = current_app.json.dumps
+        async for row in await session.stream(statement):
+            yield dumps(stream.serialize(row), separators=(',', ':')) + '\n'
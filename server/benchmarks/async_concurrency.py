@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""How many concurrent slow reads one process can serve, sync vs async.
+
+Starts the app twice on a seeded SQLite file, each time as a single process:
+gunicorn with gthread workers (wsgi.py, GUNICORN_THREADS threads) and
+uvicorn (asgi.py). Every SQL statement is delayed by --db-latency-ms inside
+the driver, standing in for a remote database. At each concurrency level the
+same mix of read requests is sent and throughput and latency are recorded.
+
+The sync server tops out at threads / latency requests per second; the async
+one is bounded by its connection pool (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+
+Run from the server directory:
+    python benchmarks/async_concurrency.py --concurrency 1,8,32,128 --db-latency-ms 20
+"""
+import argparse
+import os
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATHS = ['/games?limit=20', '/games/{id}', '/categories/{category}', '/countries?limit=20',
+         '/player_games?limit=20&sort=-rating', '/player_games/{id}']
+
+
+def install_db_latency(seconds):
+    """Sleep ``seconds`` in the driver's thread before every statement, like a network round trip."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from sqlalchemy.util import await_only
+
+    def delay(statement):
+        time.sleep(seconds)
+
+    @event.listens_for(Engine, 'connect')
+    def _slow_connection(dbapi_connection, connection_record):
+        if isinstance(dbapi_connection, sqlite3.Connection):
+            dbapi_connection.set_trace_callback(delay)
+        else:
+            # aiosqlite runs each connection in its own thread; set the callback there
+            await_only(dbapi_connection.driver_connection.set_trace_callback(delay))
+
+
+def sync_app():
+    install_db_latency(float(os.environ['BENCH_DB_LATENCY_MS']) / 1000)
+    from wsgi import application
+    return application
+
+
+def async_app():
+    install_db_latency(float(os.environ['BENCH_DB_LATENCY_MS']) / 1000)
+    from asgi import application
+    return application
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, port, env):
+    if mode == 'sync':
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--workers', '1',
+                   '--bind', f'127.0.0.1:{port}', 'benchmarks.async_concurrency:sync_app()']
+    else:
+        command = [sys.executable, '-m', 'uvicorn', '--factory', '--workers', '1', '--no-access-log',
+                   '--host', '127.0.0.1', '--port', str(port), 'benchmarks.async_concurrency:async_app']
+    process = subprocess.Popen(command, cwd=SERVER_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/countries?limit=1', timeout=1).read()
+            return process
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f'{mode} server did not start')
+
+
+def drive(port, concurrency, requests, timeout, sizes):
+    urls = [f'http://127.0.0.1:{port}' + PATHS[n % len(PATHS)].format(
+        id=1 + n % sizes['games'], category=1 + n % sizes['categories']) for n in range(requests)]
+
+    def fetch(url):
+        start = time.perf_counter()
+        try:
+            urllib.request.urlopen(url, timeout=timeout).read()
+            ok = True
+        except (urllib.error.URLError, ConnectionError, OSError):
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(fetch, urls))
+    elapsed = time.perf_counter() - start
+    latencies = [latency for latency, ok in results if ok]
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000 if latencies else None,
+        'p99_ms': percentile(latencies, 99) * 1000 if latencies else None,
+        'errors': sum(1 for _, ok in results if not ok),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', default='1,8,32,128', help='comma-separated client counts')
+    parser.add_argument('--requests-per-client', type=int, default=20)
+    parser.add_argument('--db-latency-ms', type=float, default=20.0)
+    parser.add_argument('--threads', type=int, default=4, help='gthread threads for the sync server')
+    parser.add_argument('--timeout', type=float, default=30.0)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    sizes = {'countries': 20, 'categories': 10, 'games': 1_000, 'players': 2_000, 'reviews': 20_000}
+    database = os.path.join(tempfile.mkdtemp(), 'concurrency.db')
+    env = dict(os.environ, DB_URI=f'sqlite:///{database}', LOG_REQUESTS='0', CACHE_ENABLED='0',
+               GUNICORN_THREADS=str(args.threads), BENCH_DB_LATENCY_MS=str(args.db_latency_ms))
+    subprocess.run([sys.executable, '-c', f'import seed; seed.seed_database(**{sizes!r})'],
+                   cwd=SERVER_DIR, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    print(f"db latency {args.db_latency_ms:g} ms/statement, sync: 1 process x {args.threads} threads, "
+          f"async: 1 process")
+    print(f"{'server':6} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>6}")
+    for mode in ('sync', 'async'):
+        port = free_port()
+        process = start_server(mode, port, env)
+        try:
+            for concurrency in (int(value) for value in args.concurrency.split(',')):
+                result = drive(port, concurrency, concurrency * args.requests_per_client, args.timeout, sizes)
+                print(f"{mode:6} {concurrency:7} {result['rps']:8.0f} {result['p50_ms'] or 0:8.1f} "
+                      f"{result['p99_ms'] or 0:8.1f} {result['errors']:6}")
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Compare single-item POSTs with the bulk endpoints.
+
+Run from the server directory:  python benchmarks/bulk_insert.py [items]
+Uses a throwaway SQLite database, never the app's own.
+"""
+import os
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench.db')
+os.environ['DB_URI'] = f'sqlite:///{DB_PATH}'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db  # noqa: E402
+from models import Category, Country, Player  # noqa: E402
+
+
+def reset(players):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add_all([Category(category_name='Action'), Country(country_name='USA')])
+        db.session.flush()
+        db.session.add_all([Player(username=f'p{i}', email=f'p{i}@example.com', country_id=1)
+                            for i in range(players)])
+        db.session.commit()
+
+
+def timed(label, items, send):
+    start = time.perf_counter()
+    send()
+    seconds = time.perf_counter() - start
+    print(f"{label:24} {items:7} items  {seconds:8.3f} s  {items / seconds:10,.0f} items/s")
+
+
+def main():
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    client = app.test_client()
+    games = [{'title': f'Game {i}', 'category_id': 1, 'release_year': 2000 + i % 25} for i in range(items)]
+    reviews = [{'game_id': 1 + i % items, 'player_id': 1 + i // items, 'rating': i % 5 + 1} for i in range(items)]
+
+    reset(players=1)
+    timed('POST /games', items, lambda: [client.post('/games', json=game) for game in games])
+    timed('POST /player_games', items, lambda: [client.post('/player_games', json=review) for review in reviews])
+
+    reset(players=1)
+    timed('POST /games/bulk', items, lambda: client.post('/games/bulk', json=games))
+    timed('POST /player_games/bulk', items, lambda: client.post('/player_games/bulk', json=reviews))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Write throughput with several worker processes sharing one SQLite file.
+
+Each writer is a separate process with its own app and connection pool, like
+a gunicorn worker. Writers post reviews for disjoint players, so every
+request is a valid insert plus a rating-aggregate update on a shared game
+row. Run with DB_LOCK_RETRIES=0 to see what the lock retries save.
+
+Run from the server directory:  python benchmarks/concurrent_writes.py [writers] [writes_per_writer]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GAMES = 20
+
+
+def writer(index, writers, writes, start_at, results):
+    sys.path.insert(0, SERVER_DIR)
+    from app import app
+
+    client = app.test_client()
+    statuses = {}
+    while time.time() < start_at:
+        time.sleep(0.001)
+    for n in range(writes):
+        player_id = 1 + index + writers * (n // GAMES)
+        response = client.post('/player_games', json={'game_id': 1 + n % GAMES, 'player_id': player_id,
+                                                      'rating': 1 + n % 5, 'review': 'stress'})
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    results.put(statuses)
+
+
+def main():
+    writers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    writes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    os.environ['DB_URI'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'stress.db')}"
+    os.environ.setdefault('LOG_REQUESTS', '0')
+    sys.path.insert(0, SERVER_DIR)
+    import seed
+
+    players = writers * (writes // GAMES + 1)
+    seed.seed_database(countries=5, categories=5, games=GAMES, players=players, reviews=0)
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    start_at = time.time() + 3
+    processes = [context.Process(target=writer, args=(index, writers, writes, start_at, results))
+                 for index in range(writers)]
+    for process in processes:
+        process.start()
+    totals = {}
+    for _ in processes:
+        for status, count in results.get().items():
+            totals[status] = totals.get(status, 0) + count
+    elapsed = time.time() - start_at
+    for process in processes:
+        process.join()
+
+    created = totals.get(201, 0)
+    print(f"{writers} writers x {writes} writes in {elapsed:.2f} s: {created / elapsed:.0f} writes/s, "
+          f"statuses {dict(sorted(totals.items()))}")
+
+
+if __name__ == '__main__':
+    main()
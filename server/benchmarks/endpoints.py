@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""End-to-end latency benchmark for every route registered on ``api``.
+
+Seeds a throwaway SQLite database per size, then drives each GET route (and
+POST /login) through the Flask test client and through a threaded WSGI
+server. Records p50/p95/p99 latency, throughput, queries per request and
+peak RSS, and writes everything to a JSON file that later runs can be
+compared against.
+
+Run from the server directory:
+    python benchmarks/endpoints.py --sizes small,medium --output results.json
+    python benchmarks/endpoints.py --compare results.json --output new.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SIZES = {
+    'small': {'games': 100, 'players': 1_000, 'reviews': 10_000},
+    'medium': {'games': 1_000, 'players': 10_000, 'reviews': 100_000},
+    'large': {'games': 10_000, 'players': 100_000, 'reviews': 1_000_000},
+}
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    index = min(len(samples) - 1, max(0, round(pct / 100 * len(samples)) - 1))
+    return samples[index]
+
+
+def summarize(latencies, elapsed, queries):
+    return {
+        'requests': len(latencies),
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'mean_ms': statistics.fmean(latencies) * 1000,
+        'throughput_rps': len(latencies) / elapsed,
+        'queries_per_request': queries / len(latencies),
+    }
+
+
+def discover_routes(app, api):
+    """Concrete (method, url, body) calls for every rule registered through ``api``."""
+    calls = []
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint not in api.endpoints:
+            continue
+        url = re.sub(r'<(?:\w+:)?\w+>', '1', rule.rule)
+        if 'GET' in rule.methods:
+            calls.append(('GET', url, None))
+        if rule.rule == '/login':
+            calls.append(('POST', url, {'username': None, 'password': 'password'}))
+    return sorted(calls)
+
+
+def run_size(size, args):
+    """Seed one database and benchmark every route against it, in this process."""
+    os.environ['DB_URI'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    sys.path.insert(0, SERVER_DIR)
+    from sqlalchemy import event
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    from app import app, api, db, response_cache
+    from models import Player
+    import seed
+
+    seed.seed_database(**SIZES[size], chunk_size=args.chunk_size)
+    response_cache.enabled = not args.no_cache
+    with app.app_context():
+        username = db.session.scalar(db.select(Player.username).order_by(Player.player_id))
+        counter = {'queries': 0}
+        event.listen(db.engine, 'before_cursor_execute', lambda *_: counter.__setitem__('queries', counter['queries'] + 1))
+
+    calls = [(method, url, dict(body, username=username) if body else None)
+             for method, url, body in discover_routes(app, api)]
+    results = []
+
+    if args.server in ('test-client', 'both'):
+        client = app.test_client()
+        for method, url, body in calls:
+            latencies = []
+            counter['queries'] = 0
+            status = None
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                began = time.perf_counter()
+                response = client.open(url, method=method, json=body)
+                latencies.append(time.perf_counter() - began)
+                status = response.status_code
+            elapsed = time.perf_counter() - start
+            results.append({'size': size, 'server': 'test-client', 'method': method, 'route': url,
+                            'status': status, **summarize(latencies, elapsed, counter['queries'])})
+
+    if args.server in ('wsgi', 'both'):
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f'http://127.0.0.1:{server.server_port}'
+
+        def send(method, url, body):
+            data = json.dumps(body).encode() if body else None
+            request = urllib.request.Request(base + url, data=data, method=method,
+                                             headers={'Content-Type': 'application/json'})
+            began = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as error:
+                status = error.code
+            return time.perf_counter() - began, status
+
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            for method, url, body in calls:
+                counter['queries'] = 0
+                start = time.perf_counter()
+                outcomes = list(pool.map(lambda _: send(method, url, body), range(args.requests)))
+                elapsed = time.perf_counter() - start
+                results.append({'size': size, 'server': 'wsgi', 'method': method, 'route': url,
+                                'status': outcomes[-1][1], 'concurrency': args.concurrency,
+                                **summarize([latency for latency, _ in outcomes], elapsed, counter['queries'])})
+        server.shutdown()
+
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    for result in results:
+        result['peak_rss_mb'] = peak_rss_mb
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Results whose p95 grew by more than ``threshold`` or that issue more queries."""
+    key = lambda result: (result['size'], result['server'], result['method'], result['route'])  # noqa: E731
+    previous = {key(result): result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        slower = result['p95_ms'] > old['p95_ms'] * (1 + threshold)
+        chattier = result['queries_per_request'] > old['queries_per_request'] + 0.5
+        if slower or chattier:
+            regressions.append({'size': result['size'], 'server': result['server'],
+                                'method': result['method'], 'route': result['route'],
+                                'p95_ms': [old['p95_ms'], result['p95_ms']],
+                                'queries_per_request': [old['queries_per_request'], result['queries_per_request']]})
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='small', help=f"comma separated, from {', '.join(SIZES)}")
+    parser.add_argument('--requests', type=int, default=200, help='requests per route')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads for the WSGI server')
+    parser.add_argument('--server', choices=('test-client', 'wsgi', 'both'), default='both')
+    parser.add_argument('--no-cache', action='store_true', help='disable the response cache')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='seed insert batch size')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare', help='baseline results JSON to flag regressions against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed p95 slowdown, 0.2 = 20%%')
+    parser.add_argument('--run-size', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.run_size:
+        # Child process: one size per process so RSS and the app's database are isolated
+        results = run_size(args.run_size, args)
+        with open(args.output, 'w') as output:
+            json.dump(results, output)
+        return
+
+    results = []
+    passthrough = [f'--requests={args.requests}', f'--concurrency={args.concurrency}',
+                   f'--server={args.server}', f'--chunk-size={args.chunk_size}'] + (['--no-cache'] if args.no_cache else [])
+    for size in args.sizes.split(','):
+        print(f"Benchmarking {size}...", file=sys.stderr)
+        with tempfile.NamedTemporaryFile(suffix='.json') as part:
+            subprocess.run([sys.executable, os.path.abspath(__file__), f'--run-size={size}',
+                            f'--output={part.name}', *passthrough],
+                           cwd=SERVER_DIR, stdout=subprocess.DEVNULL, check=True)
+            results.extend(json.load(part))
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'requests_per_route': args.requests,
+            'concurrency': args.concurrency,
+            'cache': not args.no_cache,
+        },
+        'results': results,
+    }
+    if args.compare:
+        with open(args.compare) as baseline:
+            report['regressions'] = compare(results, json.load(baseline), args.threshold)
+    with open(args.output, 'w') as output:
+        json.dump(report, output, indent=2)
+
+    for result in results:
+        print(f"{result['size']:6} {result['server']:11} {result['method']:4} {result['route']:42} "
+              f"{result['status']:3}  p50 {result['p50_ms']:7.2f}  p95 {result['p95_ms']:7.2f}  "
+              f"p99 {result['p99_ms']:7.2f} ms  {result['throughput_rps']:8.0f} req/s  "
+              f"{result['queries_per_request']:5.1f} q/req  {result['peak_rss_mb']:6.0f} MB")
+    for regression in report.get('regressions', []):
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    if report.get('regressions'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
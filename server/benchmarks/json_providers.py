@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Compare JSON providers on a 100k-row /player_games payload.
+
+Run from the server directory:  python benchmarks/json_providers.py [rows]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from json_provider import JSON_PROVIDERS, orjson  # noqa: E402
+
+
+def make_payload(rows):
+    rng = random.Random(42)
+    return [{
+        'id': i,
+        'game': f"Game {rng.randrange(10000)}",
+        'player': f"player_{rng.randrange(100000)}",
+        'review': "Lorem ipsum dolor sit amet " * rng.randrange(1, 5),
+        'rating': round(rng.uniform(1, 5), 1)
+    } for i in range(1, rows + 1)]
+
+
+def bench(provider_class, payload, compact, repeat=5):
+    app = Flask(__name__)
+    app.json = provider_class(app)
+    app.json.compact = compact
+    with app.app_context():
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            body = app.json.response(payload).get_data()
+            best = min(best, time.perf_counter() - start)
+    return best, len(body)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    payload = make_payload(rows)
+    for name, provider_class in JSON_PROVIDERS.items():
+        if name == 'orjson' and orjson is None:
+            print("orjson: not installed, skipped")
+            continue
+        for compact in (False, True):
+            seconds, size = bench(provider_class, payload, compact)
+            mode = 'compact' if compact else 'indented'
+            print(f"{name:7} {mode:9} {seconds * 1000:8.1f} ms  {size / 1e6:6.2f} MB  {rows / seconds:12,.0f} rows/s")
+
+
+if __name__ == '__main__':
+    main()
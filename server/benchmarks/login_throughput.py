@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Login throughput with synchronous versus queued logging.
+
+Each mode runs in a child process whose stdout is drained by this process
+with a small per-line delay, standing in for a slow log collector. With
+LOG_ASYNC=0 the request threads write to stdout themselves, which is how the
+old print() calls behaved.
+
+Run from the server directory:  python benchmarks/login_throughput.py [logins] [threads]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SINK_DELAY_SECONDS = 0.002
+
+
+def child(logins, threads):
+    sys.path.insert(0, SERVER_DIR)
+    from app import app, db, login_limiter
+    from models import Country, Player
+
+    login_limiter.enabled = False
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add(Country(country_name='USA'))
+        db.session.flush()
+        player = Player(username='bench', email='bench@example.com', country_id=1)
+        player.set_password('password')
+        db.session.add(player)
+        db.session.commit()
+
+    def worker(count):
+        client = app.test_client()
+        for _ in range(count):
+            client.post('/login', json={'username': 'bench', 'password': 'password'})
+
+    workers = [threading.Thread(target=worker, args=(logins // threads,)) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    print(f"RESULT {logins / (time.perf_counter() - start):.1f}", file=sys.stderr, flush=True)
+
+
+def run(mode, logins, threads):
+    env = dict(os.environ,
+               DB_URI=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}",
+               LOG_ASYNC=mode,
+               # Cheap hashing so logging, not the KDF, dominates
+               PASSWORD_HASH_METHOD='pbkdf2:sha256:1')
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--child', str(logins), str(threads)],
+                               cwd=SERVER_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+    def drain():
+        for _ in process.stdout:
+            time.sleep(SINK_DELAY_SECONDS)
+
+    threading.Thread(target=drain, daemon=True).start()
+    result = next(line for line in process.stderr if line.startswith('RESULT'))
+    process.wait()
+    return float(result.split()[1])
+
+
+def main():
+    if sys.argv[1:2] == ['--child']:
+        child(int(sys.argv[2]), int(sys.argv[3]))
+        return
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    for label, mode in (('synchronous stdout', '0'), ('queued writer', '1')):
+        print(f"{label:20} {run(mode, logins, threads):8.1f} logins/s")
+
+
+if __name__ == '__main__':
+    main()
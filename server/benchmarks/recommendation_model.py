@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Build and serving cost of the recommendation model at 10M ratings.
+
+Generates a synthetic rating matrix in memory (Zipf-distributed game
+popularity and player activity, ratings 1-5), then times the offline build,
+the size of the build on disk, memory-mapping it, and recommending for random
+players. The database is not involved; recommendations.Recommender adds one
+indexed lookup of the player's own ratings on top of what is measured here.
+
+Run from the server directory:
+    python benchmarks/recommendation_model.py --ratings 10_000_000 --games 20_000 --players 500_000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recommendations import Model, build_arrays, read_meta, write_model  # noqa: E402
+
+
+def synthetic_ratings(ratings, games, players, seed=0):
+    rng = np.random.default_rng(seed)
+    game_weights = 1 / np.arange(1, games + 1) ** 0.8
+    player_weights = 1 / np.arange(1, players + 1) ** 0.5
+    game_ids = rng.choice(games, ratings, p=game_weights / game_weights.sum()) + 1
+    player_ids = rng.choice(players, ratings, p=player_weights / player_weights.sum()) + 1
+    # Each game has a quality, each player a bias; ratings are noisy around both
+    quality = rng.normal(3.5, 0.6, games + 1)
+    bias = rng.normal(0, 0.4, players + 1)
+    values = np.clip(np.rint(quality[game_ids] + bias[player_ids] + rng.normal(0, 0.8, ratings)), 1, 5)
+
+    # One rating per (player, game), as the unique index on player_games enforces
+    pairs = player_ids.astype(np.int64) * (games + 1) + game_ids
+    _, first = np.unique(pairs, return_index=True)
+    return player_ids[first], game_ids[first], values[first].astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ratings', type=int, default=10_000_000)
+    parser.add_argument('--games', type=int, default=20_000)
+    parser.add_argument('--players', type=int, default=500_000)
+    parser.add_argument('--neighbors', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=2_000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    player_ids, game_ids, ratings = synthetic_ratings(args.ratings, args.games, args.players)
+    print(f"generated {ratings.size:,} ratings in {time.perf_counter() - start:.1f} s")
+
+    start = time.perf_counter()
+    arrays = build_arrays(player_ids, game_ids, ratings, args.neighbors)
+    build_seconds = time.perf_counter() - start
+    directory = tempfile.mkdtemp()
+    build = write_model(directory, arrays, {'built_at': 'benchmark', 'watermark': 0})
+    size = sum(os.path.getsize(os.path.join(build, name)) for name in os.listdir(build))
+    print(f"build: {build_seconds:.1f} s, {size / 2 ** 20:.1f} MiB on disk")
+
+    start = time.perf_counter()
+    build, meta = read_meta(directory)
+    model = Model(build, meta)
+    print(f"load (mmap): {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    # Each player's ratings, as Recommender.for_player reads them from player_games
+    order = np.argsort(player_ids, kind='stable')
+    player_ids, game_ids, ratings = player_ids[order], game_ids[order], ratings[order]
+    boundaries = np.flatnonzero(np.diff(player_ids)) + 1
+    starts = np.concatenate(([0], boundaries))
+    stops = np.concatenate((boundaries, [player_ids.size]))
+
+    rng = np.random.default_rng(1)
+    latencies, rated = [], []
+    for index in rng.integers(0, starts.size, args.requests):
+        rows = slice(starts[index], stops[index])
+        begin = time.perf_counter()
+        picks = model.recommend(game_ids[rows], ratings[rows], 10)
+        latencies.append(time.perf_counter() - begin)
+        rated.append(stops[index] - starts[index])
+        assert not set(game_id for game_id, _ in picks) & set(game_ids[rows].tolist())
+
+    latencies.sort()
+    print(f"recommend (top 10, {args.requests} players, median {statistics.median(rated):.0f} ratings each): "
+          f"p50 {statistics.median(latencies) * 1000:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms, "
+          f"max {latencies[-1] * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Rows per second serialized: ORM objects vs column rows with schema mappers.
+
+Seeds a temporary SQLite database, then reads every game and every review
+and turns each into its response dict three ways:
+
+- orm:     full ORM objects with the related row joined in, mapped field by
+           field with attribute getters (the list endpoints before schemas)
+- mapping: the schema's select(), rows turned into dicts with dict(row._mapping)
+- schema:  the schema's select(), rows turned into dicts by its mapper
+
+Times include running the query and fetching the rows; JSON encoding is not
+included (see json_providers.py).
+
+Run from the server directory:
+    python benchmarks/serialization.py --games 5000 --reviews 200000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DB_URI', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'serialization.db')}")
+os.environ.setdefault('LOG_REQUESTS', '0')
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.orm import joinedload  # noqa: E402
+from app import app  # noqa: E402
+from models import db, Game, PlayerGame  # noqa: E402
+from serializers import game_schema, player_game_schema  # noqa: E402
+import seed  # noqa: E402
+
+# The getters the list endpoints used on ORM objects
+GAME_GETTERS = {
+    'game_id': lambda game: game.game_id,
+    'title': lambda game: game.title,
+    'release_year': lambda game: game.release_year,
+    'photo_url': lambda game: game.photo_url,
+    'category': lambda game: game.category.category_name if game.category else None,
+    'rating_count': lambda game: game.rating_count,
+    'rating_sum': lambda game: game.rating_sum,
+    'avg_rating': lambda game: game.avg_rating,
+}
+
+PLAYER_GAME_GETTERS = {
+    'id': lambda player_game: player_game.id,
+    'game': lambda player_game: player_game.game.title,
+    'player': lambda player_game: player_game.player.username,
+    'review': lambda player_game: player_game.review,
+    'rating': lambda player_game: player_game.rating,
+}
+
+CASES = [
+    ('games', Game, [Game.category], GAME_GETTERS, game_schema),
+    ('player_games', PlayerGame, [PlayerGame.game, PlayerGame.player], PLAYER_GAME_GETTERS, player_game_schema),
+]
+
+
+def orm(model, relationships, getters):
+    statement = select(model).options(*(joinedload(rel) for rel in relationships))
+    objects = db.session.scalars(statement.order_by(*model.__table__.primary_key)).all()
+    return [{name: getter(obj) for name, getter in getters.items()} for obj in objects]
+
+
+def rows(schema):
+    return db.session.execute(schema.select().order_by(*schema.model.__table__.primary_key))
+
+
+def mapping(schema):
+    return [dict(row._mapping) for row in rows(schema)]
+
+
+def schema_rows(schema):
+    serialize = schema.mapper()
+    return [serialize(row) for row in rows(schema)]
+
+
+def best_of(repeat, run):
+    best = float('inf')
+    for _ in range(repeat):
+        db.session.expunge_all()  # every run builds its ORM objects from scratch
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=5_000)
+    parser.add_argument('--players', type=int, default=20_000)
+    parser.add_argument('--reviews', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    seed.seed_database(countries=50, categories=20, games=args.games, players=args.players, reviews=args.reviews)
+
+    print(f"{'rows':14} {'approach':8} {'count':>8} {'ms':>8} {'rows/s':>12} {'speedup':>8}")
+    with app.app_context():
+        for name, model, relationships, getters, schema in CASES:
+            baseline, expected = best_of(args.repeat, lambda: orm(model, relationships, getters))
+            runs = [('orm', baseline, expected),
+                    ('mapping', *best_of(args.repeat, lambda: mapping(schema))),
+                    ('schema', *best_of(args.repeat, lambda: schema_rows(schema)))]
+            for approach, seconds, result in runs:
+                assert result == expected, f"{approach} output differs from the ORM output"
+                print(f"{name:14} {approach:8} {len(result):8,} {seconds * 1000:8.1f} "
+                      f"{len(result) / seconds:12,.0f} {baseline / seconds:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+import json
+from flask import request
+from flask_restful import abort
+from models import db, Game, Category, Player, PlayerGame, increment_rating_aggregates, increment_child_counts
+from cache import add_cache_tags
+from streaming import NDJSON_MIMETYPE
+from versioning import bump_table_versions
+
+MAX_BULK_ITEMS = 10000
+
+
+def read_items():
+    """Read a bulk body: a JSON array, or one JSON object per line for NDJSON."""
+    if request.mimetype == NDJSON_MIMETYPE:
+        try:
+            items = [json.loads(line) for line in request.get_data(as_text=True).splitlines() if line.strip()]
+        except ValueError:
+            abort(400, message='Invalid NDJSON body')
+    else:
+        items = request.get_json(silent=True)
+    if not isinstance(items, list):
+        abort(400, message='Expected a JSON array of objects')
+    if len(items) > MAX_BULK_ITEMS:
+        abort(413, message=f'At most {MAX_BULK_ITEMS} items per request')
+    return items
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_integer(value):
+    # JSON true/false arrive as bool, which is an int subclass
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_string(value):
+    return isinstance(value, str)
+
+
+# (field, check, message) for each field an item may carry; a field that is
+# present and not null must pass before the item is looked up or inserted
+GAME_FIELDS = (
+    ('title', _is_string, 'title must be a string'),
+    ('category_id', _is_integer, 'category_id must be an integer'),
+    ('release_year', _is_integer, 'release_year must be an integer'),
+    ('photo_url', _is_string, 'photo_url must be a string'),
+)
+PLAYER_GAME_FIELDS = (
+    ('game_id', _is_integer, 'game_id must be an integer'),
+    ('player_id', _is_integer, 'player_id must be an integer'),
+    ('review', _is_string, 'review must be a string'),
+    ('rating', _is_number, 'rating must be a number'),
+)
+
+
+def _type_error(item, fields):
+    for name, check, message in fields:
+        if item.get(name) is not None and not check(item[name]):
+            return message
+    return None
+
+
+def _existing_ids(column, ids):
+    ids = set(ids)
+    if not ids:
+        return set()
+    return set(db.session.scalars(db.select(column).where(column.in_(ids))))
+
+
+def _insert(model, key, rows):
+    """Insert ``rows`` with one executemany and return their new primary keys in order."""
+    if not rows:
+        return []
+    statement = db.insert(model.__table__).returning(key, sort_by_parameter_order=True)
+    return list(db.session.scalars(statement, rows))
+
+
+def _results(items, errors, new_ids, id_name):
+    new_ids = iter(new_ids)
+    results = []
+    for index in range(len(items)):
+        if index in errors:
+            results.append({'index': index, 'status': 'error', 'message': errors[index]})
+        else:
+            results.append({'index': index, 'status': 'created', id_name: next(new_ids)})
+    return {'created': len(items) - len(errors), 'failed': len(errors), 'results': results}
+
+
+def create_games(items):
+    """Validate and insert games; invalid items are reported and skipped."""
+    errors, valid = {}, []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get('title') or item.get('category_id') is None:
+            errors[index] = 'Title and category_id are required'
+        elif (error := _type_error(item, GAME_FIELDS)):
+            errors[index] = error
+        else:
+            valid.append((index, item))
+
+    categories = _existing_ids(Category.category_id, (item['category_id'] for _, item in valid))
+    rows = []
+    for index, item in valid:
+        if item['category_id'] not in categories:
+            errors[index] = 'Category not found'
+        else:
+            rows.append({
+                'title': item['title'],
+                'release_year': item.get('release_year'),
+                'photo_url': item.get('photo_url'),
+                'category_id': item['category_id'],
+                'rating_count': 0,
+                'rating_sum': 0.0
+            })
+
+    new_ids = _insert(Game, Game.game_id, rows)
+    if rows:
+        added = {}
+        for row in rows:
+            added[row['category_id']] = added.get(row['category_id'], 0) + 1
+        increment_child_counts(db.session, Category, 'game_count', added)
+        bump_table_versions(db.session, {'games', 'categories'})
+        add_cache_tags(db.session, 'games:list', 'categories:list',
+                       *(f"categories:{row['category_id']}" for row in rows))
+    db.session.commit()
+    return _results(items, errors, new_ids, 'game_id')
+
+
+def create_player_games(items):
+    """Validate and insert reviews; invalid items are reported and skipped."""
+    errors, valid = {}, []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or item.get('game_id') is None or item.get('player_id') is None:
+            errors[index] = 'Missing required fields (game_id, player_id)'
+        elif (error := _type_error(item, PLAYER_GAME_FIELDS)):
+            errors[index] = error
+        else:
+            valid.append((index, item))
+
+    games = _existing_ids(Game.game_id, (item['game_id'] for _, item in valid))
+    players = _existing_ids(Player.player_id, (item['player_id'] for _, item in valid))
+    pairs = {(item['player_id'], item['game_id']) for _, item in valid}
+    reviewed = set()
+    if players and games:
+        reviewed = set(db.session.execute(
+            db.select(PlayerGame.player_id, PlayerGame.game_id)
+            .where(PlayerGame.player_id.in_(players), PlayerGame.game_id.in_(games))
+        ).tuples())
+    reviewed &= pairs
+
+    rows, deltas = [], {}
+    for index, item in valid:
+        if item['game_id'] not in games:
+            errors[index] = 'Game not found'
+        elif item['player_id'] not in players:
+            errors[index] = 'Player not found'
+        elif (item['player_id'], item['game_id']) in reviewed:
+            errors[index] = 'Player has already reviewed this game'
+        else:
+            # Later items in the same batch count as already reviewed
+            reviewed.add((item['player_id'], item['game_id']))
+            rows.append({
+                'game_id': item['game_id'],
+                'player_id': item['player_id'],
+                'review': item.get('review'),
+                'rating': item.get('rating')
+            })
+            if item.get('rating') is not None:
+                count, total = deltas.get(item['game_id'], (0, 0.0))
+                deltas[item['game_id']] = (count + 1, total + item['rating'])
+
+    new_ids = _insert(PlayerGame, PlayerGame.id, rows)
+    if rows:
+        increment_rating_aggregates(db.session, deltas)
+        bump_table_versions(db.session, {'player_games', 'games'})
+        add_cache_tags(db.session, 'games:list', 'player_games:list', *(f'games:{game_id}' for game_id in deltas))
+    db.session.commit()
+    return _results(items, errors, new_ids, 'id')
@@ -0,0 +1,237 @@
+import functools
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from flask import Response, request
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from models import Game, Category, Player, Country, PlayerGame
+from json_provider import to_response
+from streaming import wants_stream
+from versioning import table_versions, versions_token
+
+try:
+    import redis
+except ImportError:  # redis is only needed for the shared backend
+    redis = None
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class MemoryBackend:
+    """Thread-safe in-process LRU with per-entry expiry.
+
+    Counters are kept apart from the LRU and never evicted: a counter that
+    restarted at 0 would make keys built from its old values current again.
+    """
+
+    # Calls return without waiting on I/O
+    blocking = False
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def incr(self, key):
+        with self._lock:
+            value = self._counters[key] = self._counters.get(key, 0) + 1
+            return value
+
+    def counters(self, keys):
+        with self._lock:
+            return [self._counters.get(key, 0) for key in keys]
+
+
+class RedisBackend:
+    """Backend shared by every worker, for multi-process deployments."""
+
+    # Every call is a round trip to the Redis server
+    blocking = True
+
+    def __init__(self, url):
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND=redis but the redis package is not installed")
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self._client.get(key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        self._client.set(key, pickle.dumps(value), ex=ttl or None)
+
+    def incr(self, key):
+        return self._client.incr(key)
+
+    def counters(self, keys):
+        # incr stores plain integers, not pickles
+        return [int(value or 0) for value in self._client.mget(keys)]
+
+
+class ResponseCache:
+    """Read-through cache for GET responses, invalidated when writes commit.
+
+    Every cached response is keyed on the generation of its tags, e.g.
+    ``games`` and ``games:1``. Committing a change to a model bumps the tags it
+    affects, so the next read misses and old entries age out of the LRU.
+
+    The key also holds the shared ``table_versions`` of the tables the
+    response reads. With the memory backend the tag generations only see this
+    process's commits; the versions make a write committed by any worker miss
+    here too.
+    """
+
+    def __init__(self, app=None):
+        self.backend = MemoryBackend()
+        self.ttl = DEFAULT_TTL
+        self.enabled = True
+        event.listen(Session, 'after_flush', self._after_flush)
+        event.listen(Session, 'after_commit', self._after_commit)
+        event.listen(Session, 'after_soft_rollback', self._after_rollback)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.setdefault('CACHE_ENABLED', True)
+        self.ttl = app.config.setdefault('CACHE_TTL', DEFAULT_TTL)
+        backend = app.config.setdefault('CACHE_BACKEND', 'memory')
+        if backend == 'memory':
+            self.backend = MemoryBackend(app.config.setdefault('CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+        elif backend == 'redis':
+            self.backend = RedisBackend(app.config['CACHE_REDIS_URL'])
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+    def invalidate(self, *tags):
+        for tag in tags:
+            self.backend.incr(f'gen:{tag}')
+
+    def _key(self, tags, versions):
+        generations = ':'.join(map(str, self.backend.counters([f'gen:{tag}' for tag in tags])))
+        return f'response:{versions}:{generations}:{request.full_path}'
+
+    def lookup(self, namespace, item_id=None, versions=''):
+        """The cache key for this request and the cached response, if any.
+
+        ``versions`` is the ``versions_token`` of the tables the response reads.
+        """
+        tags = (namespace, f'{namespace}:{item_id}' if item_id else f'{namespace}:list')
+        key = self._key(tags, versions)
+        entry = self.backend.get(key)
+        if entry is None:
+            return key, None
+        body, status, headers = entry
+        response = Response(body, status, headers)
+        response.headers['X-Cache'] = 'HIT'
+        return key, response
+
+    def store(self, key, response):
+        if response.status_code == 200 and not response.is_streamed:
+            self.backend.set(key, (response.get_data(), response.status_code,
+                                   list(response.headers.items())), self.ttl)
+        response.headers['X-Cache'] = 'MISS'
+        return response
+
+    def cached(self, namespace, id_arg, tables):
+        """Cache a Resource ``get`` whose detail route passes ``id_arg`` and that reads ``tables``."""
+        def decorator(get):
+            @functools.wraps(get)
+            def wrapper(resource, *args, **kwargs):
+                if not self.enabled or wants_stream():
+                    return get(resource, *args, **kwargs)
+
+                versions = versions_token(table_versions(tables), tables)
+                key, response = self.lookup(namespace, kwargs.get(id_arg), versions)
+                if response is not None:
+                    return response
+                return self.store(key, to_response(get(resource, *args, **kwargs)))
+            return wrapper
+        return decorator
+
+    def _after_flush(self, session, flush_context):
+        tags = session.info.setdefault('cache_tags', set())
+        # Every column of a new or deleted row counts as changed
+        for obj in (*session.new, *session.deleted):
+            tags.update(_tags_for(obj, lambda key: True))
+        for obj in session.dirty:
+            tags.update(_tags_for(obj, functools.partial(_changed, obj)))
+        for obj in session.deleted:
+            # ON DELETE CASCADE removes their reviews (and a category's games) without the ORM
+            if isinstance(obj, (Player, Country, Category)):
+                tags.update(('games', 'player_games'))
+
+    def _after_commit(self, session):
+        tags = session.info.pop('cache_tags', None)
+        if tags:
+            self.invalidate(*tags)
+
+    def _after_rollback(self, session, previous_transaction):
+        session.info.pop('cache_tags', None)
+
+
+def _values(obj, key):
+    """Current and previously committed values of ``key`` on ``obj``."""
+    history = inspect(obj).attrs[key].history
+    return {value for value in (*history.sum(), *history.deleted) if value is not None}
+
+
+def add_cache_tags(session, *tags):
+    """Invalidate ``tags`` when ``session`` commits, for writes made without the ORM."""
+    session.info.setdefault('cache_tags', set()).update(tags)
+
+
+def _changed(obj, key):
+    return inspect(obj).attrs[key].history.has_changes()
+
+
+def _tags_for(obj, changed):
+    """The tags a write to ``obj`` invalidates; ``changed(key)`` says whether column ``key`` changed."""
+    if isinstance(obj, Game):
+        tags = {'games:list', f'games:{obj.game_id}',
+                *(f'categories:{category_id}' for category_id in _values(obj, 'category_id'))}
+        if changed('category_id'):
+            tags.add('categories:list')  # game_count
+        if changed('title'):
+            tags.add('player_games')  # reviews show the title; a deleted game's go with it
+        return tags
+    if isinstance(obj, Category):
+        tags = {'categories:list', f'categories:{obj.category_id}'}
+        if changed('category_name'):
+            tags.add('games')  # every game shows its category's name
+        return tags
+    if isinstance(obj, Country):
+        return {'countries:list', f'countries:{obj.country_id}'}
+    if isinstance(obj, Player):
+        tags = {f'countries:{country_id}' for country_id in _values(obj, 'country_id')}
+        if changed('country_id'):
+            tags.add('countries:list')  # player_count
+        if changed('username'):
+            tags.add('player_games')  # reviews show the username
+        return tags
+    if isinstance(obj, PlayerGame):
+        return {'player_games:list', f'player_games:{obj.id}'}
+    return set()
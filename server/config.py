@@ -0,0 +1,50 @@
+import os
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+DATABASE = os.environ.get("DB_URI", f"sqlite:///{os.path.join(BASE_DIR, 'app.db')}")
+
+# asyncio drivers for the async read path (asgi.py)
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "mysql": "mysql+aiomysql"}
+
+# Connection pool, per worker process
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "1") == "1"
+
+# How long a SQLite connection waits for a lock held by another worker
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", 64 * 1024))
+
+# Retries for writes that still hit "database is locked" after busy_timeout
+DB_LOCK_RETRIES = int(os.environ.get("DB_LOCK_RETRIES", 5))
+DB_LOCK_BACKOFF_SECONDS = float(os.environ.get("DB_LOCK_BACKOFF_SECONDS", 0.05))
+
+
+def engine_options(uri):
+    """SQLALCHEMY_ENGINE_OPTIONS for ``uri``."""
+    if uri.startswith("sqlite") and (uri in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in uri):
+        # In-memory SQLite uses a single shared connection, there is no pool to tune
+        return {}
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if uri.startswith("sqlite"):
+        options["connect_args"] = {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    else:
+        options["pool_recycle"] = DB_POOL_RECYCLE
+    return options
+
+
+def async_database_uri(uri):
+    """``uri`` with its driver swapped for the asyncio one, unless ASYNC_DB_URI is set."""
+    if os.environ.get("ASYNC_DB_URI"):
+        return os.environ["ASYNC_DB_URI"]
+    backend, rest = uri.split(":", 1)
+    return ASYNC_DRIVERS.get(backend.split("+")[0], backend) + ":" + rest
@@ -0,0 +1,55 @@
+import functools
+import random
+import sqlite3
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from config import (SQLITE_BUSY_TIMEOUT_MS, SQLITE_SYNCHRONOUS, SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE_KB,
+                    DB_LOCK_RETRIES, DB_LOCK_BACKOFF_SECONDS)
+from models import db
+
+
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        apply_sqlite_pragmas(dbapi_connection)
+
+
+def apply_sqlite_pragmas(dbapi_connection):
+    """Let SQLite readers and the writer work concurrently across workers."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    # NORMAL is durable in WAL mode except for the last commits on power loss
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    # A negative cache_size is in KiB rather than pages
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    # SQLite ignores foreign keys, ON DELETE CASCADE included, unless asked per connection
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def is_lock_error(error):
+    message = str(getattr(error, 'orig', error)).lower()
+    return 'database is locked' in message or 'database is busy' in message
+
+
+def retry_on_lock(view):
+    """Re-run a view when SQLite reports a lock, with jittered exponential backoff.
+
+    The whole view is retried rather than just the commit, because the rollback
+    discards the pending changes and the handler has to rebuild them.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        for attempt in range(DB_LOCK_RETRIES + 1):
+            try:
+                return view(*args, **kwargs)
+            except OperationalError as error:
+                if attempt == DB_LOCK_RETRIES or not is_lock_error(error):
+                    raise
+                db.session.rollback()
+                time.sleep(DB_LOCK_BACKOFF_SECONDS * 2 ** attempt * random.uniform(0.5, 1.5))
+    return wrapper
@@ -0,0 +1,24 @@
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:5555")
+
+# Several processes for CPU-bound work (hashing, JSON), threads for waiting on the database
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then to bound memory growth
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = 1000
+
+# Each worker imports the app itself, so no database connections or logging
+# threads are shared across fork
+preload_app = False
+
+accesslog = None  # the app writes its own structured request log
+errorlog = "-"
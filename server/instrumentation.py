@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+slow_query_logger = logging.getLogger('slow_query')
+
+DEFAULT_SLOW_QUERY_MS = 100
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Series:
+    __slots__ = ('requests', 'buckets', 'wall', 'db', 'queries', 'serialize')
+
+    def __init__(self):
+        self.requests = 0
+        self.buckets = [0] * len(BUCKETS)
+        self.wall = 0.0
+        self.db = 0.0
+        self.queries = 0
+        self.serialize = 0.0
+
+
+class RequestMetrics:
+    """Query count, DB time, serialization time and wall time for every request.
+
+    Each response carries them in a ``Server-Timing`` header, ``/metrics``
+    exposes running totals in the Prometheus text format, and statements
+    slower than ``SLOW_QUERY_MS`` are logged with the endpoint and method
+    that issued them.
+    """
+
+    def __init__(self, app=None):
+        self.slow_query_seconds = DEFAULT_SLOW_QUERY_MS / 1000
+        self._series = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.slow_query_seconds = app.config.setdefault('SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS) / 1000
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+
+        # Time every JSON encode, whether it comes from jsonify or a Resource tuple
+        encode = app.json.response
+
+        def timed_response(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return encode(*args, **kwargs)
+            finally:
+                if has_request_context() and 'metrics' in g:
+                    g.metrics['serialize'] += time.perf_counter() - start
+
+        app.json.response = timed_response
+
+    def add_collector(self, collector):
+        """Add a callable returning extra Prometheus lines for ``/metrics``."""
+        self._collectors.append(collector)
+
+    def _before_request(self):
+        g.metrics = {'start': time.perf_counter(), 'queries': 0, 'db': 0.0, 'serialize': 0.0}
+
+    def _after_request(self, response):
+        metrics = g.pop('metrics', None)
+        if metrics is None:
+            return response
+        wall = time.perf_counter() - metrics['start']
+        response.headers['Server-Timing'] = (
+            f'db;dur={metrics["db"] * 1000:.2f};desc="{metrics["queries"]} queries", '
+            f'serialize;dur={metrics["serialize"] * 1000:.2f}, '
+            f'total;dur={wall * 1000:.2f}'
+        )
+
+        key = (request.endpoint or 'unknown', request.method, response.status_code)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series()
+            series.requests += 1
+            index = bisect_left(BUCKETS, wall)
+            if index < len(BUCKETS):
+                series.buckets[index] += 1
+            series.wall += wall
+            series.db += metrics['db']
+            series.queries += metrics['queries']
+            series.serialize += metrics['serialize']
+        return response
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info['query_start'].pop()
+        in_request = has_request_context() and 'metrics' in g
+        if in_request:
+            g.metrics['queries'] += 1
+            g.metrics['db'] += duration
+        if duration >= self.slow_query_seconds:
+            slow_query_logger.warning(
+                "slow query %.1f ms in %s %s: %s",
+                duration * 1000,
+                request.method if in_request else '-',
+                request.endpoint if in_request else '-',
+                ' '.join(statement.split())
+            )
+
+    def metrics_view(self):
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        with self._lock:
+            series = sorted(self._series.items())
+            family('http_request_duration_seconds', 'histogram', 'Wall time per request.')
+            for (endpoint, method, status), values in series:
+                labels = f'endpoint="{endpoint}",method="{method}",status="{status}"'
+                cumulative = 0
+                for bound, count in zip(BUCKETS, values.buckets):
+                    cumulative += count
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {values.requests}')
+                lines.append(f'http_request_duration_seconds_sum{{{labels}}} {values.wall}')
+                lines.append(f'http_request_duration_seconds_count{{{labels}}} {values.requests}')
+            for name, attribute, help_text in (
+                ('http_request_db_queries_total', 'queries', 'SQL statements executed.'),
+                ('http_request_db_seconds_total', 'db', 'Time spent executing SQL.'),
+                ('http_request_serialize_seconds_total', 'serialize', 'Time spent encoding JSON.'),
+            ):
+                family(name, 'counter', help_text)
+                for (endpoint, method, status), values in series:
+                    labels = f'endpoint="{endpoint}",method="{method}",status="{status}"'
+                    lines.append(f'{name}{{{labels}}} {getattr(values, attribute)}')
+        for collector in self._collectors:
+            lines.extend(collector())
+        return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,68 @@
+from flask import Response, current_app
+from flask.json.provider import DefaultJSONProvider
+from flask_restful.utils import unpack
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the stdlib provider is used without it
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, encoding straight to bytes."""
+
+    def _encode(self, obj, indent=False, sort_keys=None):
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if self.sort_keys if sort_keys is None else sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        return self._encode(obj, kwargs.get('indent'), kwargs.get('sort_keys')).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._encode(obj, indent) + b'\n', mimetype=self.mimetype)
+
+
+JSON_PROVIDERS = {
+    'json': DefaultJSONProvider,
+    'orjson': OrjsonProvider,
+}
+
+
+def get_json_provider_class(name=None):
+    """Pick a provider by name; ``None`` or ``'auto'`` prefers orjson when installed."""
+    if not name or name == 'auto':
+        return OrjsonProvider if orjson is not None else DefaultJSONProvider
+    if name not in JSON_PROVIDERS:
+        raise ValueError(f"Unknown JSON provider: {name}")
+    if name == 'orjson' and orjson is None:
+        raise RuntimeError("JSON_PROVIDER=orjson but orjson is not installed")
+    return JSON_PROVIDERS[name]
+
+
+def output_json(data, code, headers=None):
+    """Flask-RESTful representation that encodes through ``app.json``."""
+    if isinstance(data, Response):
+        # Handlers that return ``jsonify(...), status`` are already encoded
+        response = data
+    else:
+        response = current_app.json.response(data)
+    response.status_code = code
+    response.headers.extend(headers or {})
+    return response
+
+
+def to_response(rv):
+    """Turn whatever a Resource method returned into a Response."""
+    if isinstance(rv, Response):
+        return rv
+    data, code, headers = unpack(rv)
+    return output_json(data, code, headers)
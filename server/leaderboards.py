@@ -0,0 +1,167 @@
+import logging
+import threading
+import time
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+from models import db, Game, Category, Country, Player, PlayerGame
+
+DEFAULT_SIZE = 10
+DEFAULT_REFRESH_SECONDS = 60
+DEFAULT_DEBOUNCE_SECONDS = 1.0
+
+logger = logging.getLogger('app.leaderboards')
+
+
+class Leaderboards:
+    """Top-N rankings computed in a few SQL queries and served from memory.
+
+    The rankings go stale when a commit touched games, players or reviews in
+    this process, and at least every ``LEADERBOARD_REFRESH_SECONDS`` so writes
+    made by other workers show up too. Reads keep getting the previous
+    rankings while a background thread rebuilds them; the rebuild waits
+    ``LEADERBOARD_DEBOUNCE_SECONDS`` first so a burst of writes costs one.
+    Only the very first read, with nothing to serve yet, builds inline.
+    """
+
+    def __init__(self, app=None):
+        self.size = DEFAULT_SIZE
+        self.refresh_seconds = DEFAULT_REFRESH_SECONDS
+        self.debounce_seconds = DEFAULT_DEBOUNCE_SECONDS
+        self._app = None
+        self._rankings = None
+        self._built_at = 0.0
+        self._stale = True
+        self._rebuild_thread = None
+        self._lock = threading.Lock()
+        event.listen(Session, 'after_flush', self._after_flush)
+        event.listen(Session, 'after_commit', self._after_commit)
+        event.listen(Session, 'after_soft_rollback', self._after_rollback)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self._app = app
+        self.size = app.config.setdefault('LEADERBOARD_SIZE', DEFAULT_SIZE)
+        self.refresh_seconds = app.config.setdefault('LEADERBOARD_REFRESH_SECONDS', DEFAULT_REFRESH_SECONDS)
+        self.debounce_seconds = app.config.setdefault('LEADERBOARD_DEBOUNCE_SECONDS', DEFAULT_DEBOUNCE_SECONDS)
+
+    def _after_flush(self, session, flush_context):
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            if isinstance(obj, (Game, Category, Country, Player, PlayerGame)):
+                session.info['leaderboards_stale'] = True
+                return
+
+    def _after_commit(self, session):
+        if session.info.pop('leaderboards_stale', False):
+            self.invalidate()
+
+    def _after_rollback(self, session, previous_transaction):
+        session.info.pop('leaderboards_stale', None)
+
+    def invalidate(self):
+        self._stale = True
+
+    def rankings(self):
+        if self._rankings is None:
+            with self._lock:
+                if self._rankings is None:
+                    self._rebuild()
+        elif self._stale or time.monotonic() - self._built_at > self.refresh_seconds:
+            self._schedule_rebuild()
+        return self._rankings
+
+    def _schedule_rebuild(self):
+        with self._lock:
+            if self._rebuild_thread is not None:
+                return
+            self._rebuild_thread = threading.Thread(target=self._rebuild_later, name='leaderboards', daemon=True)
+        self._rebuild_thread.start()
+
+    def _rebuild_later(self):
+        try:
+            time.sleep(self.debounce_seconds)
+            with self._app.app_context():
+                self._rebuild()
+        except Exception:
+            # Keep serving the previous rankings; the next read schedules another try
+            self._stale = True
+            logger.exception('leaderboard rebuild failed')
+        finally:
+            with self._lock:
+                self._rebuild_thread = None
+
+    def _rebuild(self):
+        # Clear the flag first so a write during the rebuild triggers another one
+        self._stale = False
+        rankings = self._build()
+        self._rankings, self._built_at = rankings, time.monotonic()
+
+    def _build(self):
+        avg_rating = (Game.rating_sum / Game.rating_count).label('avg_rating')
+        game_rank = func.row_number().over(
+            partition_by=Game.category_id,
+            order_by=(avg_rating.desc(), Game.rating_count.desc(), Game.game_id)
+        ).label('rank')
+        games = (select(Game.game_id, Game.title, Game.category_id, Category.category_name,
+                        Game.rating_count, avg_rating, game_rank)
+                 .join(Category)
+                 .where(Game.rating_count > 0)
+                 .subquery())
+        top_per_category = db.session.execute(
+            select(games).where(games.c.rank <= self.size)
+            .order_by(games.c.category_id, games.c.rank)
+        ).mappings().all()
+
+        review_count = func.count(PlayerGame.id).label('review_count')
+        activity = (select(Player.player_id, Player.username, Player.country_id, review_count)
+                    .join(PlayerGame)
+                    .group_by(Player.player_id)
+                    .subquery())
+        player_rank = func.row_number().over(
+            partition_by=activity.c.country_id,
+            order_by=(activity.c.review_count.desc(), activity.c.player_id)
+        ).label('rank')
+        players = select(activity, player_rank).subquery()
+        top_per_country = db.session.execute(
+            select(players).where(players.c.rank <= self.size)
+            .order_by(players.c.country_id, players.c.rank)
+        ).mappings().all()
+
+        # The overall top N is always among the per-category top N
+        overall = sorted(top_per_category,
+                         key=lambda row: (-row['avg_rating'], -row['rating_count'], row['game_id']))
+
+        categories = {}
+        for row in top_per_category:
+            categories.setdefault(row['category_id'], []).append(_game_entry(row))
+        countries = {}
+        for row in top_per_country:
+            countries.setdefault(row['country_id'], []).append({
+                'player_id': row['player_id'],
+                'username': row['username'],
+                'review_count': row['review_count']
+            })
+        return {
+            'games': [_game_entry(row) for row in overall[:self.size]],
+            'categories': categories,
+            'countries': countries,
+        }
+
+    def top_games(self):
+        return self.rankings()['games']
+
+    def top_games_in_category(self, category_id):
+        return self.rankings()['categories'].get(category_id, [])
+
+    def top_players_in_country(self, country_id):
+        return self.rankings()['countries'].get(country_id, [])
+
+
+def _game_entry(row):
+    return {
+        'game_id': row['game_id'],
+        'title': row['title'],
+        'category': row['category_name'],
+        'rating_count': row['rating_count'],
+        'avg_rating': row['avg_rating']
+    }
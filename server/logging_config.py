@@ -0,0 +1,120 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, request
+
+REDACTED = '[REDACTED]'
+SENSITIVE_KEYS = {'password', 'password_hash', 'access_token', 'refresh_token', 'token', 'authorization'}
+JWT_PATTERN = re.compile(r'eyJ[\w-]+\.[\w-]+\.[\w-]+')
+
+request_logger = logging.getLogger('app.request')
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any ``fields``."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RedactingFilter(logging.Filter):
+    """Mask secrets in structured fields and bearer tokens in messages."""
+
+    def filter(self, record):
+        fields = getattr(record, 'fields', None)
+        if fields:
+            record.fields = {key: REDACTED if key.lower() in SENSITIVE_KEYS else value
+                             for key, value in fields.items()}
+        message = record.getMessage()
+        if JWT_PATTERN.search(message):
+            record.msg = JWT_PATTERN.sub(REDACTED, message)
+            record.args = ()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only ``rate`` of the records below WARNING; warnings and errors always pass."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or self.rate >= 1 or random.random() < self.rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full."""
+
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
+def configure_logging(app):
+    """Route app logs through a bounded queue drained by a background writer thread."""
+    level = app.config.setdefault('LOG_LEVEL', 'INFO')
+    sample_rate = app.config.setdefault('LOG_SAMPLE_RATE', 1.0)
+    queue_size = app.config.setdefault('LOG_QUEUE_SIZE', 10000)
+
+    writer = logging.StreamHandler(sys.stdout)
+    writer.setFormatter(JsonFormatter())
+
+    if app.config.setdefault('LOG_ASYNC', True):
+        handler = DroppingQueueHandler(queue.Queue(queue_size))
+        listener = QueueListener(handler.queue, writer, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+    else:
+        handler = writer
+    # Filters run in the request thread, before the record is queued
+    handler.addFilter(RedactingFilter())
+    handler.addFilter(SamplingFilter(sample_rate))
+
+    for name in ('app', 'slow_query'):
+        logger = logging.getLogger(name)
+        logger.setLevel(level)
+        logger.addHandler(handler)
+        logger.propagate = False
+
+    if app.config.setdefault('LOG_REQUESTS', True):
+        app.before_request(_start_timer)
+        app.after_request(_log_request)
+
+
+def _start_timer():
+    g.log_start = time.perf_counter()
+
+
+def _log_request(response):
+    start = g.pop('log_start', None)
+    if start is not None:
+        request_logger.info('request', extra={'fields': {
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'duration_ms': round((time.perf_counter() - start) * 1000, 2),
+            'remote_addr': request.remote_addr,
+        }})
+    return response
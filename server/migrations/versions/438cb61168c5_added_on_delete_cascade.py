@@ -0,0 +1,143 @@
+"""added on delete cascade
+
+Revision ID: 438cb61168c5
+Revises: edc3f9cdf3de
+Create Date: 2026-10-18 19:14:21.340208
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '438cb61168c5'
+down_revision = 'edc3f9cdf3de'
+branch_labels = None
+depends_on = None
+
+# The search triggers as of this revision. Frozen here rather than imported
+# from search.py, like d3f6a2b8c4e1; the rebuild leaves search_index alone.
+SEARCH_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS search_games_insert AFTER INSERT ON games BEGIN
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.game_id * 4, 'game', new.game_id, new.title || ' ' || coalesce(
+            (SELECT category_name FROM categories WHERE category_id = new.category_id), ''));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_games_update AFTER UPDATE OF title, category_id ON games BEGIN
+        DELETE FROM search_index WHERE rowid = old.game_id * 4;
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.game_id * 4, 'game', new.game_id, new.title || ' ' || coalesce(
+            (SELECT category_name FROM categories WHERE category_id = new.category_id), ''));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_games_delete AFTER DELETE ON games BEGIN
+        DELETE FROM search_index WHERE rowid = old.game_id * 4;
+    END""",
+
+    """CREATE TRIGGER IF NOT EXISTS search_categories_insert AFTER INSERT ON categories BEGIN
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.category_id * 4 + 1, 'category', new.category_id, new.category_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_categories_update AFTER UPDATE OF category_name ON categories BEGIN
+        DELETE FROM search_index WHERE rowid = old.category_id * 4 + 1;
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.category_id * 4 + 1, 'category', new.category_id, new.category_name);
+        DELETE FROM search_index WHERE rowid IN (SELECT game_id * 4 FROM games WHERE category_id = new.category_id);
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        SELECT game_id * 4, 'game', game_id, title || ' ' || new.category_name
+        FROM games WHERE category_id = new.category_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_categories_delete AFTER DELETE ON categories BEGIN
+        DELETE FROM search_index WHERE rowid = old.category_id * 4 + 1;
+    END""",
+
+    """CREATE TRIGGER IF NOT EXISTS search_players_insert AFTER INSERT ON players BEGIN
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.player_id * 4 + 2, 'player', new.player_id, new.username);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_players_update AFTER UPDATE OF username ON players BEGIN
+        DELETE FROM search_index WHERE rowid = old.player_id * 4 + 2;
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.player_id * 4 + 2, 'player', new.player_id, new.username);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_players_delete AFTER DELETE ON players BEGIN
+        DELETE FROM search_index WHERE rowid = old.player_id * 4 + 2;
+    END""",
+
+    """CREATE TRIGGER IF NOT EXISTS search_reviews_insert AFTER INSERT ON player_games
+    WHEN new.review IS NOT NULL BEGIN
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.id * 4 + 3, 'review', new.id, new.review);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_reviews_update AFTER UPDATE OF review ON player_games BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 3;
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        SELECT new.id * 4 + 3, 'review', new.id, new.review WHERE new.review IS NOT NULL;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_reviews_delete AFTER DELETE ON player_games BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 3;
+    END""",
+]
+
+
+def drop_search_triggers():
+    # Batch mode rebuilds each table under a temporary name and renames it
+    # back; SQLite rejects the rename while the search triggers refer to the
+    # tables, so they are dropped for the rebuild and created again after
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for (name,) in op.get_bind().exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'search\\_%' ESCAPE '\\'").all():
+        op.execute(f'DROP TRIGGER {name}')
+
+
+def create_search_triggers():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in SEARCH_TRIGGERS:
+        op.execute(statement)
+
+
+def upgrade():
+    drop_search_triggers()
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('games', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_games_category_id_categories'), type_='foreignkey')
+        batch_op.create_foreign_key(batch_op.f('fk_games_category_id_categories'), 'categories', ['category_id'], ['category_id'], ondelete='CASCADE')
+
+    with op.batch_alter_table('player_games', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_player_games_player_id_players'), type_='foreignkey')
+        batch_op.drop_constraint(batch_op.f('fk_player_games_game_id_games'), type_='foreignkey')
+        batch_op.create_foreign_key(batch_op.f('fk_player_games_game_id_games'), 'games', ['game_id'], ['game_id'], ondelete='CASCADE')
+        batch_op.create_foreign_key(batch_op.f('fk_player_games_player_id_players'), 'players', ['player_id'], ['player_id'], ondelete='CASCADE')
+
+    with op.batch_alter_table('players', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_players_country_id_countries'), type_='foreignkey')
+        batch_op.create_foreign_key(batch_op.f('fk_players_country_id_countries'), 'countries', ['country_id'], ['country_id'], ondelete='CASCADE')
+
+    # ### end Alembic commands ###
+
+    create_search_triggers()
+
+
+def downgrade():
+    drop_search_triggers()
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('players', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_players_country_id_countries'), type_='foreignkey')
+        batch_op.create_foreign_key(batch_op.f('fk_players_country_id_countries'), 'countries', ['country_id'], ['country_id'])
+
+    with op.batch_alter_table('player_games', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_player_games_player_id_players'), type_='foreignkey')
+        batch_op.drop_constraint(batch_op.f('fk_player_games_game_id_games'), type_='foreignkey')
+        batch_op.create_foreign_key(batch_op.f('fk_player_games_game_id_games'), 'games', ['game_id'], ['game_id'])
+        batch_op.create_foreign_key(batch_op.f('fk_player_games_player_id_players'), 'players', ['player_id'], ['player_id'])
+
+    with op.batch_alter_table('games', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_games_category_id_categories'), type_='foreignkey')
+        batch_op.create_foreign_key(batch_op.f('fk_games_category_id_categories'), 'categories', ['category_id'], ['category_id'])
+
+    # ### end Alembic commands ###
+
+    create_search_triggers()
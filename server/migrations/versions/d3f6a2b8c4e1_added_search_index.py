@@ -0,0 +1,124 @@
+"""added search index
+
+Revision ID: d3f6a2b8c4e1
+Revises: b71a0c4d2e96
+Create Date: 2026-10-18 14:02:37.114520
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3f6a2b8c4e1'
+down_revision = 'b71a0c4d2e96'
+branch_labels = None
+depends_on = None
+
+# The search DDL as of this revision. Frozen here rather than imported from
+# search.py, so later changes there need a migration of their own.
+SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+    "kind UNINDEXED, ref_id UNINDEXED, text, tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+
+    """CREATE TRIGGER IF NOT EXISTS search_games_insert AFTER INSERT ON games BEGIN
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.game_id * 4, 'game', new.game_id, new.title || ' ' || coalesce(
+            (SELECT category_name FROM categories WHERE category_id = new.category_id), ''));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_games_update AFTER UPDATE OF title, category_id ON games BEGIN
+        DELETE FROM search_index WHERE rowid = old.game_id * 4;
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.game_id * 4, 'game', new.game_id, new.title || ' ' || coalesce(
+            (SELECT category_name FROM categories WHERE category_id = new.category_id), ''));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_games_delete AFTER DELETE ON games BEGIN
+        DELETE FROM search_index WHERE rowid = old.game_id * 4;
+    END""",
+
+    """CREATE TRIGGER IF NOT EXISTS search_categories_insert AFTER INSERT ON categories BEGIN
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.category_id * 4 + 1, 'category', new.category_id, new.category_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_categories_update AFTER UPDATE OF category_name ON categories BEGIN
+        DELETE FROM search_index WHERE rowid = old.category_id * 4 + 1;
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.category_id * 4 + 1, 'category', new.category_id, new.category_name);
+        DELETE FROM search_index WHERE rowid IN (SELECT game_id * 4 FROM games WHERE category_id = new.category_id);
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        SELECT game_id * 4, 'game', game_id, title || ' ' || new.category_name
+        FROM games WHERE category_id = new.category_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_categories_delete AFTER DELETE ON categories BEGIN
+        DELETE FROM search_index WHERE rowid = old.category_id * 4 + 1;
+    END""",
+
+    """CREATE TRIGGER IF NOT EXISTS search_players_insert AFTER INSERT ON players BEGIN
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.player_id * 4 + 2, 'player', new.player_id, new.username);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_players_update AFTER UPDATE OF username ON players BEGIN
+        DELETE FROM search_index WHERE rowid = old.player_id * 4 + 2;
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.player_id * 4 + 2, 'player', new.player_id, new.username);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_players_delete AFTER DELETE ON players BEGIN
+        DELETE FROM search_index WHERE rowid = old.player_id * 4 + 2;
+    END""",
+
+    """CREATE TRIGGER IF NOT EXISTS search_reviews_insert AFTER INSERT ON player_games
+    WHEN new.review IS NOT NULL BEGIN
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.id * 4 + 3, 'review', new.id, new.review);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_reviews_update AFTER UPDATE OF review ON player_games BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 3;
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        SELECT new.id * 4 + 3, 'review', new.id, new.review WHERE new.review IS NOT NULL;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_reviews_delete AFTER DELETE ON player_games BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 3;
+    END""",
+]
+
+TRIGGERS = [
+    'search_games_insert', 'search_games_update', 'search_games_delete',
+    'search_categories_insert', 'search_categories_update', 'search_categories_delete',
+    'search_players_insert', 'search_players_update', 'search_players_delete',
+    'search_reviews_insert', 'search_reviews_update', 'search_reviews_delete',
+]
+
+
+def upgrade():
+    # FTS5 and triggers are SQLite only; other databases use the LIKE fallback
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in SEARCH_DDL:
+        op.execute(statement)
+
+    # Index the rows that existed before the triggers
+    op.execute("""
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        SELECT g.game_id * 4, 'game', g.game_id, g.title || ' ' || coalesce(c.category_name, '')
+        FROM games g LEFT JOIN categories c ON c.category_id = g.category_id
+    """)
+    op.execute("""
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        SELECT category_id * 4 + 1, 'category', category_id, category_name FROM categories
+    """)
+    op.execute("""
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        SELECT player_id * 4 + 2, 'player', player_id, username FROM players
+    """)
+    op.execute("""
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        SELECT id * 4 + 3, 'review', id, review FROM player_games WHERE review IS NOT NULL
+    """)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for trigger in TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    op.execute('DROP TABLE IF EXISTS search_index')
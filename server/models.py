@@ -1,29 +1,68 @@
-from sqlalchemy_serializer import SerializerMixin
 from sqlalchemy.ext.associationproxy import association_proxy
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import MetaData
+from sqlalchemy import MetaData, event, func, inspect, or_, select
+from sqlalchemy.orm import Session
+from flask import current_app, has_app_context
+from functools import lru_cache
 from werkzeug.security import generate_password_hash, check_password_hash
 metadata = MetaData(
     naming_convention={
+        "ix": "ix_%(column_0_label)s",
         "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
     }
 )
 db = SQLAlchemy(metadata=metadata)
 
+
+def password_hash_method():
+    """The configured werkzeug hash method, e.g. ``pbkdf2:sha256:600000`` or ``scrypt``."""
+    if has_app_context():
+        return current_app.config.get('PASSWORD_HASH_METHOD')
+    return None
+
+
+@lru_cache(maxsize=8)
+def _hash_prefix(method):
+    # werkzeug fills in default parameters, so hash once to learn the full prefix
+    hashed = generate_password_hash('', method) if method else generate_password_hash('')
+    return hashed.split('$', 1)[0]
+
+
+def hash_password(password):
+    method = password_hash_method()
+    return generate_password_hash(password, method) if method else generate_password_hash(password)
+
 # Models go here!
 class Game(db.Model):
     __tablename__ = 'games'
+    # Sort and foreign key indexes end with the primary key, so a keyset page
+    # seeks straight to its cursor and reads the rows in ORDER BY order
+    __table_args__ = (
+        db.Index('ix_games_title_game_id', 'title', 'game_id'),
+        db.Index('ix_games_release_year_game_id', 'release_year', 'game_id'),
+        db.Index('ix_games_category_id_game_id', 'category_id', 'game_id'),
+    )
 
     game_id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     release_year = db.Column(db.Integer)
     photo_url = db.Column(db.String(255))
-    category_id = db.Column(db.Integer, db.ForeignKey('categories.category_id'), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.category_id', ondelete='CASCADE'), nullable=False)
+    # Rating aggregates, kept in sync with player_games by _update_rating_aggregates
+    rating_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_sum = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
 
-    # Relationships
-    player_games = db.relationship('PlayerGame', back_populates='game', cascade='all, delete-orphan')
+    # Relationships; the database deletes the reviews of a deleted game (ON DELETE CASCADE)
+    player_games = db.relationship('PlayerGame', back_populates='game', cascade='all, delete-orphan',
+                                   passive_deletes=True)
     category = db.relationship('Category', back_populates='games')
 
+    @property
+    def avg_rating(self):
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
     def __repr__(self):
         return f"<Game(title='{self.title}', genre='{self.genre}', release_year={self.release_year})>"
 
@@ -33,9 +72,13 @@ class Category(db.Model):
 
     category_id = db.Column(db.Integer, primary_key=True)
     category_name = db.Column(db.String(50), nullable=False)
+    # Kept in sync with games by _update_child_counts
+    game_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
-    # Relationships
-    games = db.relationship('Game', back_populates='category', cascade='all, delete-orphan')
+    # Relationships; write-only so a category never loads all of its games.
+    # Deleting a category leaves them, and their reviews, to ON DELETE CASCADE.
+    games = db.relationship('Game', back_populates='category', cascade='all, delete-orphan', lazy='write_only',
+                            passive_deletes=True)
 
     def __repr__(self):
         return f"<Category(category_name='{self.category_name}')>"
@@ -43,15 +86,19 @@ class Category(db.Model):
 
 class Player(db.Model):
     __tablename__ = 'players'
+    __table_args__ = (
+        db.Index('ix_players_country_id_player_id', 'country_id', 'player_id'),
+    )
 
     player_id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(30), nullable=False, unique=True)
     email = db.Column(db.String(120), nullable=False, unique=True)
-    country_id = db.Column(db.Integer, db.ForeignKey('countries.country_id'), nullable=False)
+    country_id = db.Column(db.Integer, db.ForeignKey('countries.country_id', ondelete='CASCADE'), nullable=False)
     password_hash = db.Column(db.String(128))  # Added password_hash column
 
-    # Relationships
-    player_games = db.relationship('PlayerGame', back_populates='player', cascade='all, delete-orphan')
+    # Relationships; the database deletes the reviews of a deleted player (ON DELETE CASCADE)
+    player_games = db.relationship('PlayerGame', back_populates='player', cascade='all, delete-orphan',
+                                   passive_deletes=True)
     country = db.relationship('Country', back_populates='players')
 
     def __repr__(self):
@@ -59,21 +106,30 @@ class Player(db.Model):
 
     # Method to set the password (hashes the password)
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     # Method to check if the provided password matches the hash
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+    # True if the stored hash was made with other parameters than the configured ones
+    def needs_rehash(self):
+        stored = (self.password_hash or '').split('$', 1)[0]
+        return stored != _hash_prefix(password_hash_method())
+
 
 class Country(db.Model):
     __tablename__ = 'countries'
 
     country_id = db.Column(db.Integer, primary_key=True)
     country_name = db.Column(db.String(30), nullable=False)
+    # Kept in sync with players by _update_child_counts
+    player_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
-    # Relationships
-    players = db.relationship('Player', back_populates='country', cascade='all, delete-orphan')
+    # Relationships; write-only so a country never loads all of its players.
+    # Deleting a country leaves them, and their reviews, to ON DELETE CASCADE.
+    players = db.relationship('Player', back_populates='country', cascade='all, delete-orphan', lazy='write_only',
+                              passive_deletes=True)
 
     def __repr__(self):
         return f"<Country(country_name='{self.country_name}')>"
@@ -81,16 +137,239 @@ class Country(db.Model):
 
 class PlayerGame(db.Model):
     __tablename__ = 'player_games'
+    # One review per player and game; a player's reviews are paged by id or by rating
+    __table_args__ = (
+        db.Index('ix_player_games_player_id_game_id', 'player_id', 'game_id', unique=True),
+        db.Index('ix_player_games_player_id_id', 'player_id', 'id'),
+        db.Index('ix_player_games_player_id_rating_id', 'player_id', 'rating', 'id'),
+        db.Index('ix_player_games_game_id_id', 'game_id', 'id'),
+        db.Index('ix_player_games_rating_id', 'rating', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    game_id = db.Column(db.Integer, db.ForeignKey('games.game_id'), nullable=False)
-    player_id = db.Column(db.Integer, db.ForeignKey('players.player_id'), nullable=False)
+    game_id = db.Column(db.Integer, db.ForeignKey('games.game_id', ondelete='CASCADE'), nullable=False)
+    player_id = db.Column(db.Integer, db.ForeignKey('players.player_id', ondelete='CASCADE'), nullable=False)
     review = db.Column(db.String(255))
-    rating=db.Column(db.Float,nullable=True)
+    rating = db.Column(db.Float, nullable=True)
 
     # Relationships
     game = db.relationship('Game', back_populates='player_games')
     player = db.relationship('Player', back_populates='player_games')
 
     def __repr__(self):
-        return f"<PlayerGame(game_id={self.game_id}, player_id={self.player_id}, review='{self.review}')>"
\ No newline at end of file
+        return f"<PlayerGame(game_id={self.game_id}, player_id={self.player_id}, review='{self.review}')>"
+
+
+class TableVersion(db.Model):
+    __tablename__ = 'table_versions'
+
+    # Bumped in the same transaction as every ORM write to the table
+    table_name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<TableVersion(table_name='{self.table_name}', version={self.version})>"
+
+
+def _committed_value(obj, key):
+    """The value of ``key`` as it is in the database, before this flush."""
+    history = inspect(obj).attrs[key].load_history()
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return None
+
+
+@event.listens_for(Session, 'before_flush')
+def _update_rating_aggregates(session, flush_context, instances):
+    """Apply the rating changes in this flush to Game.rating_count/rating_sum."""
+    deltas = {}
+
+    def add(game, rating, sign):
+        if game is None or rating is None:
+            return
+        count, total = deltas.get(game, (0, 0.0))
+        deltas[game] = (count + sign, total + sign * rating)
+
+    with session.no_autoflush:
+        for obj in session.new:
+            if isinstance(obj, PlayerGame):
+                game = obj.game if obj.game is not None else session.get(Game, obj.game_id)
+                add(game, obj.rating, 1)
+
+        for obj in session.deleted:
+            if isinstance(obj, PlayerGame):
+                game_id = _committed_value(obj, 'game_id')
+                add(session.get(Game, game_id) if game_id else None, _committed_value(obj, 'rating'), -1)
+
+        for obj in session.dirty:
+            if not isinstance(obj, PlayerGame) or not session.is_modified(obj):
+                continue
+            state = inspect(obj)
+            if not (state.attrs.rating.history.has_changes() or state.attrs.game_id.history.has_changes()):
+                continue
+            old_game_id = _committed_value(obj, 'game_id')
+            add(session.get(Game, old_game_id) if old_game_id else None, _committed_value(obj, 'rating'), -1)
+            add(session.get(Game, obj.game_id), obj.rating, 1)
+
+        cascaded = _cascaded_rating_deltas(session)
+
+    for game, (count, total) in deltas.items():
+        if game in session.deleted or (count == 0 and total == 0):
+            continue
+        if game in session.new:
+            game.rating_count = (game.rating_count or 0) + count
+            game.rating_sum = (game.rating_sum or 0.0) + total
+        else:
+            # Increment in SQL so concurrent writers don't overwrite each other
+            game.rating_count = Game.rating_count + count
+            game.rating_sum = Game.rating_sum + total
+    increment_rating_aggregates(session, cascaded)
+
+
+def _cascaded_rating_deltas(session):
+    """``{game_id: (count, total)}`` to take off for reviews ON DELETE CASCADE removes in this flush.
+
+    The reviews of a deleted player, or of a deleted country's players, are
+    never loaded, so their ratings are summed in one grouped query instead.
+    """
+    player_ids = [obj.player_id for obj in session.deleted if isinstance(obj, Player)]
+    country_ids = [obj.country_id for obj in session.deleted if isinstance(obj, Country)]
+    if not (player_ids or country_ids):
+        return {}
+    # Reviews deleted through the ORM were counted with the rest of the flush
+    tracked = [obj.id for obj in session.deleted if isinstance(obj, PlayerGame)]
+    owned = or_(PlayerGame.player_id.in_(player_ids),
+                PlayerGame.player_id.in_(select(Player.player_id).where(Player.country_id.in_(country_ids))))
+    rows = session.execute(
+        select(PlayerGame.game_id, func.count(), func.sum(PlayerGame.rating))
+        .where(owned, PlayerGame.rating.isnot(None), PlayerGame.id.not_in(tracked))
+        .group_by(PlayerGame.game_id)
+    )
+    return {game_id: (-count, -total) for game_id, count, total in rows}
+
+
+def cascaded_tables(tables):
+    """``tables`` plus every table ON DELETE CASCADE deletes from when rows of ``tables`` go."""
+    tables = set(tables)
+    pending = list(tables)
+    while pending:
+        parent = pending.pop()
+        for table in metadata.sorted_tables:
+            if table.name in tables:
+                continue
+            if any(fk.ondelete == 'CASCADE' and fk.column.table.name == parent for fk in table.foreign_keys):
+                tables.add(table.name)
+                pending.append(table.name)
+    return tables
+
+
+# (child, foreign key, relationship, parent, counter) for the parents' child counts
+CHILD_COUNTS = (
+    (Player, 'country_id', 'country', Country, 'player_count'),
+    (Game, 'category_id', 'category', Category, 'game_count'),
+)
+
+
+@event.listens_for(Session, 'before_flush')
+def _update_child_counts(session, flush_context, instances):
+    """Apply the children added, removed or moved in this flush to their parents' counters."""
+    deltas = {}
+
+    def add(parent, counter, sign):
+        if parent is not None:
+            deltas[(parent, counter)] = deltas.get((parent, counter), 0) + sign
+
+    def parent_of(obj, key, relationship, parent_model):
+        parent = getattr(obj, relationship)
+        if parent is None and getattr(obj, key) is not None:
+            parent = session.get(parent_model, getattr(obj, key))
+        return parent
+
+    with session.no_autoflush:
+        for child, key, relationship, parent_model, counter in CHILD_COUNTS:
+            for obj in session.new:
+                if isinstance(obj, child):
+                    add(parent_of(obj, key, relationship, parent_model), counter, 1)
+
+            for obj in session.deleted:
+                if isinstance(obj, child):
+                    parent_id = _committed_value(obj, key)
+                    add(session.get(parent_model, parent_id) if parent_id else None, counter, -1)
+
+            for obj in session.dirty:
+                if not isinstance(obj, child) or not session.is_modified(obj):
+                    continue
+                state = inspect(obj)
+                if not (state.attrs[key].history.has_changes() or state.attrs[relationship].history.has_changes()):
+                    continue
+                old_parent_id = _committed_value(obj, key)
+                new_parent = parent_of(obj, key, relationship, parent_model)
+                if new_parent is not None and inspect(new_parent).identity == (old_parent_id,):
+                    continue
+                add(session.get(parent_model, old_parent_id) if old_parent_id else None, counter, -1)
+                add(new_parent, counter, 1)
+
+    for (parent, counter), delta in deltas.items():
+        if delta == 0 or parent in session.deleted:
+            continue
+        if parent in session.new:
+            setattr(parent, counter, (getattr(parent, counter) or 0) + delta)
+        else:
+            # Increment in SQL so concurrent writers don't overwrite each other
+            setattr(parent, counter, getattr(type(parent), counter) + delta)
+
+
+def increment_child_counts(session, parent_model, counter, deltas):
+    """Add ``{parent_id: delta}`` to a CHILD_COUNTS counter, for inserts made without the ORM."""
+    if not deltas:
+        return
+    table = parent_model.__table__
+    key = table.primary_key.columns[0]
+    session.execute(
+        db.update(table)
+        .where(key == db.bindparam('_parent_id'))
+        .values({counter: table.c[counter] + db.bindparam('_delta')}),
+        [{'_parent_id': parent_id, '_delta': delta} for parent_id, delta in deltas.items()]
+    )
+
+
+def recompute_child_counts(session):
+    """Rebuild every CHILD_COUNTS counter from the child tables."""
+    for child, key, _, parent_model, counter in CHILD_COUNTS:
+        parent_key = parent_model.__table__.primary_key.columns[0]
+        count = (select(func.count()).select_from(child)
+                 .where(getattr(child, key) == parent_key)
+                 .scalar_subquery())
+        session.execute(db.update(parent_model).values({counter: count}))
+
+
+def increment_rating_aggregates(session, deltas):
+    """Add ``{game_id: (count, total)}`` to the games' aggregates in one executemany."""
+    if not deltas:
+        return
+    game_id = db.bindparam('_game_id')
+    session.execute(
+        db.update(Game.__table__)
+        .where(Game.__table__.c.game_id == game_id)
+        .values(rating_count=Game.__table__.c.rating_count + db.bindparam('_count'),
+                rating_sum=Game.__table__.c.rating_sum + db.bindparam('_total')),
+        [{'_game_id': key, '_count': count, '_total': total} for key, (count, total) in deltas.items()]
+    )
+
+
+def recompute_rating_aggregates(session):
+    """Rebuild every game's rating aggregates from player_games.
+
+    Needed after writes that bypass the ORM, such as bulk inserts.
+    """
+    rated = PlayerGame.rating.isnot(None)
+    count = (select(func.count(PlayerGame.id))
+             .where(PlayerGame.game_id == Game.game_id, rated)
+             .scalar_subquery())
+    total = (select(func.coalesce(func.sum(PlayerGame.rating), 0.0))
+             .where(PlayerGame.game_id == Game.game_id, rated)
+             .scalar_subquery())
+    session.execute(db.update(Game).values(rating_count=count, rating_sum=total))
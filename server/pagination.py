@@ -0,0 +1,124 @@
+import base64
+import binascii
+import json
+from collections import namedtuple
+from flask import request
+from flask_restful import abort
+from sqlalchemy import and_, union_all
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+Page = namedtuple('Page', ['items', 'next_cursor'])
+
+
+def encode_cursor(key):
+    """Turn the last sort key of a page into an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, pair=False):
+    """Turn a cursor back into the key it was built from.
+
+    Plain cursors hold an integer primary key; with ``pair`` the cursor holds
+    ``[sort value, primary key]`` as written for a sorted page.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        abort(400, message='Invalid cursor')
+    if pair:
+        valid = isinstance(key, list) and len(key) == 2 and isinstance(key[1], int)
+    else:
+        valid = isinstance(key, int)
+    if not valid:
+        abort(400, message='Invalid cursor')
+    return key
+
+
+def get_limit():
+    limit = request.args.get('limit', DEFAULT_LIMIT, type=int)
+    if limit < 1:
+        abort(400, message='limit must be a positive integer')
+    return min(limit, MAX_LIMIT)
+
+
+def ordering(key, sort=None, descending=False):
+    """ORDER BY clauses for ``sort`` with ``key`` as the tiebreaker."""
+    columns = [key] if sort is None or sort is key else [sort, key]
+    return [column.desc() for column in columns] if descending else columns
+
+
+def _after(key, sort, value, last_key, descending):
+    """The rows past (value, last_key) in ORDER BY sort, key, as one condition per index range.
+
+    Each range is a single seek on a (sort, key) index: the rest of the
+    current value's rows, then the later values. SQLite sorts NULLs first,
+    so they precede every value ascending and follow them descending.
+    """
+    later_key = key < last_key if descending else key > last_key
+    if value is None:
+        if descending:
+            return [and_(sort.is_(None), later_key)]
+        return [and_(sort.is_(None), later_key), sort.isnot(None)]
+    later_value = sort < value if descending else sort > value
+    ranges = [and_(sort == value, later_key), later_value]
+    return ranges + [sort.is_(None)] if descending else ranges
+
+
+def page_query(statement, key, sort=None, descending=False):
+    """The ``select()`` ``statement`` narrowed to the requested page, plus the page size.
+
+    ``statement`` must select ``key`` and ``sort`` under their own names.
+    Past the first page of a sorted listing, each index range after the
+    cursor is selected on its own and the ranges are merged with UNION ALL,
+    so deep pages cost the same as the first. An OR of the ranges, or a row
+    value comparison, makes SQLite scan the index from its start instead.
+    """
+    limit = get_limit()
+    cursor = request.args.get('cursor')
+    if cursor and (sort is None or sort is key):
+        last_key = decode_cursor(cursor)
+        statement = statement.where(key < last_key if descending else key > last_key)
+    elif cursor:
+        value, last_key = decode_cursor(cursor, pair=True)
+        ranges = _after(key, sort, value, last_key, descending)
+        if len(ranges) > 1:
+            merged = union_all(*(statement.where(condition) for condition in ranges))
+            columns = merged.selected_columns
+            return merged.order_by(*ordering(columns[key.key], columns[sort.key], descending)).limit(limit + 1), limit
+        statement = statement.where(ranges[0])
+
+    # Fetch one extra row to know whether another page exists
+    return statement.order_by(*ordering(key, sort, descending)).limit(limit + 1), limit
+
+
+def make_page(items, limit, key, sort=None):
+    """Trim the extra row fetched by ``page_query`` and build the next cursor."""
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last_key = getattr(items[-1], key.key)
+        by_key = sort is None or sort is key
+        next_cursor = encode_cursor(last_key if by_key else [getattr(items[-1], sort.key), last_key])
+    return Page(items, next_cursor)
+
+
+def paginate_rows(session, statement, key, sort=None, descending=False):
+    """Return one keyset page of the ``select()`` ``statement``, ordered by the integer column ``key``.
+
+    Reads ``limit`` and ``cursor`` from the query string. Rows after the cursor
+    are selected with ``key > last_key`` so deep pages cost the same as the first.
+    With ``sort`` the page is ordered by ``(sort, key)`` and the cursor carries
+    both values; a ``(sort, key)`` index keeps this cheap. The page holds result rows.
+    """
+    statement, limit = page_query(statement, key, sort, descending)
+    return make_page(session.execute(statement).all(), limit, key, sort)
+
+
+def page_headers(page):
+    """Headers telling the client how to fetch the next page."""
+    if page.next_cursor is None:
+        return {}
+    return {'X-Next-Cursor': page.next_cursor}
@@ -0,0 +1,161 @@
+from collections import namedtuple
+from flask import request
+from flask_restful import abort
+from sqlalchemy import and_, literal_column, select
+from models import Game, Player, PlayerGame, Category, Country
+from serializers import (game_schema, player_schema, player_game_schema, category_schema, country_schema,
+                         player_library_schema, CATEGORY_GAME_FIELDS, COUNTRY_PLAYER_FIELDS)
+
+
+def requested_sort(sorts, default):
+    """The column and direction asked for with ``?sort=name`` or ``?sort=-name``."""
+    sort = request.args.get('sort', default)
+    descending = sort.startswith('-')
+    sort = sort.lstrip('-')
+    if sort not in sorts:
+        abort(400, message=f"sort must be one of {', '.join(sorts)}")
+    return sorts[sort], descending
+
+
+ListQuery = namedtuple('ListQuery', ['query', 'sort', 'descending', 'fields', 'serialize'])
+
+
+class Listing:
+    """The filters, sort keys and fields a list endpoint accepts, and their SQL.
+
+    ``filters`` maps a query parameter to ``(type, condition)`` where
+    ``condition(value)`` returns a WHERE clause. ``sorts`` maps a ``sort``
+    value to an indexed column. The output fields are those of ``schema``;
+    only the requested ones are SELECTed.
+    """
+
+    def __init__(self, schema, key, sorts, filters=None):
+        self.schema = schema
+        self.model = schema.model
+        self.key = key
+        self.sorts = sorts
+        self.filters = filters or {}
+
+    def query(self, fields=None):
+        """A ``select()`` for ``?<filter>=``, ``?sort=`` and ``?fields=`` from the request.
+
+        ``fields`` is the default field list when the client does not send one.
+        """
+        conditions = []
+        for name, (type_, condition) in self.filters.items():
+            raw = request.args.get(name)
+            if raw is None:
+                continue
+            try:
+                value = type_(raw)
+            except ValueError:
+                abort(400, message=f'{name} must be of type {type_.__name__}')
+            conditions.append(condition(value))
+
+        sort, descending = requested_sort(self.sorts, self.key.key)
+
+        requested = request.args.get('fields')
+        if requested:
+            fields = [name for name in requested.split(',') if name]
+            unknown = [name for name in fields if name not in self.schema.fields]
+            if unknown:
+                abort(400, message=f"Unknown fields: {', '.join(unknown)}; choose from {', '.join(self.schema.fields)}")
+        fields = list(fields or self.schema.fields)
+        # The primary key is always returned
+        if self.key.key not in fields:
+            fields.insert(0, self.key.key)
+        fields = tuple(fields)
+
+        # The key and sort column are read back for the cursor even if not returned
+        extra = []
+        for column in (self.key, sort):
+            if not any(column is selected for selected in (*extra, *(self.schema.fields[name] for name in fields))):
+                extra.append(column)
+
+        query = self.schema.select(fields, extra).where(*conditions)
+        return ListQuery(query, sort, descending, fields, self.schema.mapper(fields))
+
+
+# Children shown on a detail page, paged by primary key over the foreign key index
+def category_games_query(category_id):
+    return game_schema.select(CATEGORY_GAME_FIELDS).where(Game.category_id == category_id)
+
+
+def country_players_query(country_id):
+    return player_schema.select(COUNTRY_PLAYER_FIELDS).where(Player.country_id == country_id)
+
+
+# One player's reviews with their game and category, read in a single join that
+# starts from the (player_id, id) or (player_id, rating, id) index, already in page order
+PLAYER_LIBRARY_SORTS = {'id': PlayerGame.id, 'rating': PlayerGame.rating}
+
+
+def player_library_query(player_id):
+    return player_library_schema.select().where(PlayerGame.player_id == player_id)
+
+
+def _average_at_least(value):
+    return and_(Game.rating_count > 0, Game.rating_sum >= value * Game.rating_count)
+
+
+def _players_in_country(value):
+    # The +0 keeps SQLite from collecting every review of the country through the
+    # player_id index and sorting them; it walks the sort index instead, checking
+    # each review against the country's players, and stops when the page is full
+    return (PlayerGame.player_id + literal_column('0')).in_(select(Player.player_id).where(Player.country_id == value))
+
+
+game_listing = Listing(
+    game_schema, Game.game_id,
+    sorts={
+        'game_id': Game.game_id,
+        'title': Game.title,
+        'release_year': Game.release_year,
+        'category_id': Game.category_id,
+    },
+    filters={
+        'category_id': (int, lambda value: Game.category_id == value),
+        'release_year': (int, lambda value: Game.release_year == value),
+        'min_release_year': (int, lambda value: Game.release_year >= value),
+        'max_release_year': (int, lambda value: Game.release_year <= value),
+        'min_rating': (float, _average_at_least),
+    },
+)
+
+player_listing = Listing(
+    player_schema, Player.player_id,
+    sorts={
+        'player_id': Player.player_id,
+        'username': Player.username,
+        'country_id': Player.country_id,
+    },
+    filters={
+        'country_id': (int, lambda value: Player.country_id == value),
+    },
+)
+
+player_game_listing = Listing(
+    player_game_schema, PlayerGame.id,
+    sorts={
+        'id': PlayerGame.id,
+        'game_id': PlayerGame.game_id,
+        'rating': PlayerGame.rating,
+    },
+    filters={
+        'game_id': (int, lambda value: PlayerGame.game_id == value),
+        'player_id': (int, lambda value: PlayerGame.player_id == value),
+        'country_id': (int, _players_in_country),
+        'min_rating': (float, lambda value: PlayerGame.rating >= value),
+        'max_rating': (float, lambda value: PlayerGame.rating <= value),
+    },
+)
+
+category_listing = Listing(
+    category_schema, Category.category_id,
+    sorts={'category_id': Category.category_id},
+)
+
+country_listing = Listing(
+    country_schema, Country.country_id,
+    sorts={'country_id': Country.country_id},
+)
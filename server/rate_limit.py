@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_KEYS = 100000
+
+
+class TokenBucket:
+    """Per-key token buckets holding up to ``capacity`` tokens, refilled at ``rate``/s.
+
+    Only the ``max_keys`` most recently used keys are remembered, so memory
+    stays bounded when an attacker cycles through usernames or addresses.
+    """
+
+    def __init__(self, capacity, rate, max_keys=DEFAULT_MAX_KEYS):
+        self.capacity = capacity
+        self.rate = rate
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key):
+        """Take one token for ``key``; return 0 if allowed, else seconds until one is free."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0
+            else:
+                retry_after = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+    def refund(self, key):
+        """Give back the token a call to ``consume`` took for ``key``."""
+        with self._lock:
+            if key in self._buckets:
+                tokens, updated = self._buckets[key]
+                self._buckets[key] = (min(self.capacity, tokens + 1), updated)
+
+
+class LoginLimiter:
+    """Throttle login attempts per username and per client IP, before any hashing.
+
+    A successful login gives its username token back, so only failed attempts
+    use up a username's budget and nobody can lock a user out of an account
+    they can log in to. The IP bucket is charged either way.
+
+    The buckets live in this process. Each gunicorn worker keeps its own, so
+    with N workers a client can get up to N times the configured burst and
+    rate, depending on which workers its requests land on.
+    """
+
+    def __init__(self, app=None):
+        self.by_username = TokenBucket(5, 5 / 60)
+        self.by_ip = TokenBucket(20, 1.0)
+        self.enabled = True
+        self._counts = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.setdefault('LOGIN_RATE_LIMIT_ENABLED', True)
+        self.by_username = TokenBucket(app.config.setdefault('LOGIN_USERNAME_BURST', 5),
+                                       app.config.setdefault('LOGIN_USERNAME_PER_SECOND', 5 / 60))
+        self.by_ip = TokenBucket(app.config.setdefault('LOGIN_IP_BURST', 20),
+                                 app.config.setdefault('LOGIN_IP_PER_SECOND', 1.0))
+
+    def check(self, username, ip):
+        """Seconds the client must wait, or 0 if the attempt may go ahead."""
+        if not self.enabled:
+            return 0
+        # Charge both buckets so a blocked username still costs the caller's IP
+        return max(self.by_ip.consume(ip), self.by_username.consume(username.lower()))
+
+    def succeeded(self, username):
+        """Refund the username token ``check`` took for a login that succeeded."""
+        if self.enabled:
+            self.by_username.refund(username.lower())
+
+    def record(self, outcome):
+        with self._lock:
+            self._counts[outcome] = self._counts.get(outcome, 0) + 1
+
+    def metrics_lines(self):
+        with self._lock:
+            counts = sorted(self._counts.items())
+        lines = ['# HELP login_attempts_total Login attempts by outcome.',
+                 '# TYPE login_attempts_total counter']
+        lines += [f'login_attempts_total{{outcome="{outcome}"}} {count}' for outcome, count in counts]
+        return lines
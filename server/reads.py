@@ -0,0 +1,109 @@
+"""Read endpoints shared by the Flask resources and the asyncio server.
+
+Each read is a generator that does no I/O: it yields the ``select()``
+statements it needs, is sent back their rows, and returns
+``(body, status, headers)``, or a ``Stream`` when the client asked for
+NDJSON. ``run`` drives one on the Flask-SQLAlchemy session and
+``AsyncReads`` on the async session, so both servers query, serialize and
+answer the same way. A ``Read`` also names the cache namespace and the
+tables its ETag and cache key are built from.
+"""
+from collections import namedtuple
+from models import db, Game, Category, Country, Player, PlayerGame
+from pagination import page_query, make_page, page_headers
+from queries import (game_listing, category_listing, country_listing, player_game_listing,
+                     category_games_query, country_players_query)
+from serializers import (game_schema, player_game_schema, category_schema, country_schema, category_detail,
+                         country_detail)
+from streaming import wants_stream, stream_rows
+
+Read = namedtuple('Read', ['steps', 'namespace', 'id_arg', 'tables'])
+
+# Every row of a listing, in page order, as NDJSON; the arguments of stream_rows
+Stream = namedtuple('Stream', ['query', 'key', 'serialize', 'sort', 'descending'])
+
+
+def run(steps):
+    """Run the read ``steps`` on ``db.session``; a Stream becomes an NDJSON response."""
+    try:
+        statement = next(steps)
+        while True:
+            statement = steps.send(db.session.execute(statement).all())
+    except StopIteration as done:
+        result = done.value
+    if isinstance(result, Stream):
+        return stream_rows(*result)
+    return result
+
+
+def _one(schema, condition):
+    rows = yield schema.select().where(condition)
+    return rows[0] if rows else None
+
+
+def _page(statement, key, sort=None, descending=False):
+    # pagination.paginate_rows, one statement at a time
+    statement, limit = page_query(statement, key, sort, descending)
+    return make_page((yield statement), limit, key, sort)
+
+
+def _listing(listing, not_found=None, envelope=None):
+    """One page of ``listing``, or a Stream of all of it for NDJSON.
+
+    An empty page is a 404 with the ``not_found`` message when one is given;
+    ``envelope`` wraps the rows as ``{envelope: rows}``.
+    """
+    listed = listing.query()
+    if wants_stream():
+        return Stream(listed.query, listing.key, listed.serialize, listed.sort, listed.descending)
+    page = yield from _page(listed.query, listing.key, listed.sort, listed.descending)
+    if not page.items and not_found:
+        return {'message': not_found}, 404, {}
+    rows = [listed.serialize(row) for row in page.items]
+    return ({envelope: rows} if envelope else rows), 200, page_headers(page)
+
+
+def _games(game_id=None):
+    if game_id:
+        game = yield from _one(game_schema, Game.game_id == game_id)
+        if game is None:
+            return {'message': 'Game not found'}, 404, {}
+        return game_schema.mapper()(game), 200, {}
+    return (yield from _listing(game_listing))
+
+
+def _categories(category_id=None):
+    if category_id:
+        category = yield from _one(category_schema, Category.category_id == category_id)
+        if category is None:
+            return {'message': 'Category not found'}, 404, {}
+        # One keyset page of its games; game_count says how many there are in all
+        page = yield from _page(category_games_query(category_id), Game.game_id)
+        return category_detail(category, page.items), 200, page_headers(page)
+    return (yield from _listing(category_listing))
+
+
+def _countries(country_id=None):
+    if country_id:
+        country = yield from _one(country_schema, Country.country_id == country_id)
+        if country is None:
+            return {'message': 'Country not found'}, 404, {}
+        # One keyset page of its players; player_count says how many there are in all
+        page = yield from _page(country_players_query(country_id), Player.player_id)
+        return country_detail(country, page.items), 200, page_headers(page)
+    return (yield from _listing(country_listing, 'No countries found', 'countries'))
+
+
+def _player_games(player_game_id=None):
+    if player_game_id:
+        player_game = yield from _one(player_game_schema, PlayerGame.id == player_game_id)
+        if player_game is None:
+            return {'message': 'PlayerGame not found'}, 404, {}
+        return player_game_schema.mapper()(player_game), 200, {}
+    return (yield from _listing(player_game_listing, 'No player-game relationships found'))
+
+
+games = Read(_games, 'games', 'game_id', ('games', 'categories', 'player_games'))
+categories = Read(_categories, 'categories', 'category_id', ('categories', 'games', 'player_games'))
+countries = Read(_countries, 'countries', 'country_id', ('countries', 'players'))
+player_games = Read(_player_games, 'player_games', 'player_game_id', ('player_games', 'games', 'players'))
@@ -0,0 +1,300 @@
+"""Item-item game recommendations from the player x game rating matrix.
+
+The model is built offline from every rated review and written to disk as
+plain ``.npy`` arrays. Workers memory-map the current build, so serving a
+player is a few neighbour-row lookups plus a top-k, never a scan of
+``player_games``:
+
+- ``game_ids``:   model row -> game_id
+- ``neighbors``:  (games, k) model rows of each game's most similar games
+- ``weights``:    (games, k) their adjusted-cosine similarities
+- ``popular``:    model rows by popularity, for players with no ratings
+
+Rebuild on a schedule (cron, a systemd timer) with
+
+    cd server && python recommendations.py build --min-new-ratings 10000
+
+Each build goes to a new directory and ``CURRENT`` is swapped atomically;
+workers pick it up within ``RECOMMENDER_RELOAD_SECONDS``.
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+import numpy as np
+from scipy import sparse
+from sqlalchemy import func, select
+from models import db, PlayerGame
+
+DEFAULT_NEIGHBORS = 50
+DEFAULT_RELOAD_SECONDS = 60
+DEFAULT_BLOCK_MEMORY = 256 * 2 ** 20
+# Peak bytes per similarity cell of a block: the sparse product (float32
+# value, int32 index) beside its dense copy (float32), then the dense block
+# beside argpartition's int64 rows
+BLOCK_BYTES_PER_CELL = 12
+KEEP_BUILDS = 2
+
+
+def build_arrays(player_ids, game_ids, ratings, neighbors=DEFAULT_NEIGHBORS, block_memory=DEFAULT_BLOCK_MEMORY):
+    """Compute the model arrays from parallel rating arrays.
+
+    Similarity is the cosine between games' rating columns after subtracting
+    each player's mean rating, keeping the ``neighbors`` most similar games
+    per game. The similarity matrix is computed a block of columns at a time,
+    as many columns as fit ``games * columns * BLOCK_BYTES_PER_CELL`` into
+    ``block_memory`` bytes; that is the peak on top of the rating matrix.
+    """
+    _, players = np.unique(player_ids, return_inverse=True)
+    model_game_ids, games = np.unique(game_ids, return_inverse=True)
+    player_count = int(players.max()) + 1
+    ratings = np.asarray(ratings, dtype=np.float32)
+
+    # Adjusted cosine: centre each player's ratings on their own mean
+    counts = np.bincount(players, minlength=player_count)
+    means = np.bincount(players, ratings, minlength=player_count) / np.maximum(counts, 1)
+    centred = ratings - means[players].astype(np.float32)
+
+    matrix = sparse.csc_matrix((centred, (players, games)), shape=(player_count, model_game_ids.size),
+                               dtype=np.float32)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    matrix = matrix @ sparse.diags(1 / np.where(norms > 0, norms, 1), format='csc')
+    transposed = matrix.T.tocsr()
+
+    k = min(neighbors, max(model_game_ids.size - 1, 1))
+    neighbor_rows = np.full((model_game_ids.size, k), -1, dtype=np.int32)
+    weights = np.zeros((model_game_ids.size, k), dtype=np.float32)
+    block = max(1, block_memory // (BLOCK_BYTES_PER_CELL * model_game_ids.size))
+    for start in range(0, model_game_ids.size, block):
+        stop = min(start + block, model_game_ids.size)
+        similarity = (transposed @ matrix[:, start:stop]).toarray()
+        similarity[np.arange(start, stop), np.arange(stop - start)] = 0  # a game is not its own neighbour
+        # Negated in place for the ascending argpartition, rather than copied
+        np.negative(similarity, out=similarity)
+        top = np.argpartition(similarity, k - 1, axis=0)[:k]
+        top_weights = -np.take_along_axis(similarity, top, axis=0)
+        del similarity
+        order = np.argsort(-top_weights, axis=0)
+        top = np.take_along_axis(top, order, axis=0).T
+        top_weights = np.take_along_axis(top_weights, order, axis=0).T
+        keep = top_weights > 0
+        neighbor_rows[start:stop] = np.where(keep, top, -1)
+        weights[start:stop] = np.where(keep, top_weights, 0)
+
+    # Popularity for cold starts: Bayesian average pulls sparse games towards the global mean
+    game_counts = np.bincount(games, minlength=model_game_ids.size)
+    game_sums = np.bincount(games, ratings, minlength=model_game_ids.size)
+    prior = max(float(np.median(game_counts)), 1.0)
+    bayesian = (game_sums + prior * ratings.mean()) / (game_counts + prior)
+    popular = np.argsort(-bayesian, kind='stable').astype(np.int32)
+
+    return {
+        'game_ids': model_game_ids.astype(np.int64),
+        'neighbors': neighbor_rows,
+        'weights': weights,
+        'popular': popular,
+    }
+
+
+def load_ratings(session):
+    """Every rated review as ``(player_ids, game_ids, ratings)`` arrays, plus a watermark."""
+    rows = session.execute(
+        select(PlayerGame.player_id, PlayerGame.game_id, PlayerGame.rating)
+        .where(PlayerGame.rating.isnot(None))
+        .execution_options(yield_per=100_000)
+    )
+    player_ids, game_ids, ratings = [], [], []
+    for partition in rows.partitions():
+        # Each column straight into its own dtype; ids past 2**53 do not survive a float64
+        players, games, scores = zip(*partition)
+        player_ids.append(np.array(players, dtype=np.int64))
+        game_ids.append(np.array(games, dtype=np.int64))
+        ratings.append(np.array(scores, dtype=np.float32))
+    if not ratings:
+        return None
+    watermark = session.scalar(select(func.max(PlayerGame.id)))
+    return np.concatenate(player_ids), np.concatenate(game_ids), np.concatenate(ratings), watermark
+
+
+def write_model(directory, arrays, meta):
+    """Write a build next to the current one and point ``CURRENT`` at it."""
+    os.makedirs(directory, exist_ok=True)
+    build = tempfile.mkdtemp(prefix='build-', dir=directory)
+    for name, array in arrays.items():
+        np.save(os.path.join(build, f'{name}.npy'), array)
+    with open(os.path.join(build, 'meta.json'), 'w') as file:
+        json.dump(meta, file)
+
+    pointer = os.path.join(directory, 'CURRENT')
+    with tempfile.NamedTemporaryFile('w', dir=directory, delete=False) as file:
+        file.write(os.path.basename(build))
+    os.replace(file.name, pointer)
+
+    # Workers that still map an old build keep reading it after the unlink
+    builds = sorted((entry for entry in os.scandir(directory) if entry.is_dir() and entry.name.startswith('build-')),
+                    key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in builds[KEEP_BUILDS:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+    return build
+
+
+def read_meta(directory):
+    try:
+        with open(os.path.join(directory, 'CURRENT')) as file:
+            build = os.path.join(directory, file.read().strip())
+        with open(os.path.join(build, 'meta.json')) as file:
+            return build, json.load(file)
+    except FileNotFoundError:
+        return None, None
+
+
+def build_model(session, directory, neighbors=DEFAULT_NEIGHBORS, min_new_ratings=0,
+                block_memory=DEFAULT_BLOCK_MEMORY):
+    """Rebuild the model from the database; skipped if fewer than ``min_new_ratings`` were added."""
+    _, meta = read_meta(directory)
+    if meta and min_new_ratings:
+        watermark = session.scalar(select(func.max(PlayerGame.id))) or 0
+        if watermark - meta['watermark'] < min_new_ratings:
+            return None
+    loaded = load_ratings(session)
+    if loaded is None:
+        return None
+    player_ids, game_ids, ratings, watermark = loaded
+    start = time.perf_counter()
+    arrays = build_arrays(player_ids, game_ids, ratings, neighbors, block_memory)
+    meta = {
+        'built_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'ratings': int(ratings.size),
+        'games': int(arrays['game_ids'].size),
+        'neighbors': int(arrays['neighbors'].shape[1]),
+        'watermark': int(watermark),
+        'build_seconds': round(time.perf_counter() - start, 3),
+    }
+    write_model(directory, arrays, meta)
+    return meta
+
+
+class Model:
+    """One memory-mapped build."""
+
+    def __init__(self, build, meta):
+        self.meta = meta
+        arrays = {name: np.load(os.path.join(build, f'{name}.npy'), mmap_mode='r')
+                  for name in ('game_ids', 'neighbors', 'weights', 'popular')}
+        self.game_ids = arrays['game_ids']
+        self.neighbors = arrays['neighbors']
+        self.weights = arrays['weights']
+        self.popular = arrays['popular']
+
+    def recommend(self, rated_game_ids, ratings, limit):
+        """Top ``limit`` ``(game_id, score)`` pairs for a player's ratings.
+
+        The score is the player's mean plus the similarity-weighted average of
+        their deviations on each candidate's neighbours that they rated.
+        """
+        rated_game_ids = np.asarray(rated_game_ids, dtype=np.int64)
+        ratings = np.asarray(ratings, dtype=np.float32)
+        positions = np.searchsorted(self.game_ids, rated_game_ids)
+        positions = np.minimum(positions, self.game_ids.size - 1)
+        known = self.game_ids[positions] == rated_game_ids
+        rows, ratings = positions[known], ratings[known]
+        if rows.size == 0:
+            return self._popular(rated_game_ids, limit)
+
+        mean = float(ratings.mean())
+        candidates = np.asarray(self.neighbors[rows])
+        weights = np.asarray(self.weights[rows])
+        valid = candidates >= 0
+        candidates, weights = candidates[valid], weights[valid]
+        deviations = np.broadcast_to((ratings - mean)[:, None], valid.shape)[valid]
+
+        unique, inverse = np.unique(candidates, return_inverse=True)
+        totals = np.bincount(inverse, weights * deviations, minlength=unique.size)
+        norms = np.bincount(inverse, weights, minlength=unique.size)
+        scores = mean + totals / np.maximum(norms, 1e-6)
+        # Prefer games backed by more evidence when predictions tie
+        scores += 1e-3 * np.log1p(norms)
+
+        unseen = ~np.isin(unique, rows)
+        unique, scores = unique[unseen], scores[unseen]
+        if unique.size == 0:
+            return self._popular(rated_game_ids, limit)
+        top = np.argpartition(-scores, min(limit, unique.size) - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [(int(self.game_ids[unique[index]]), float(scores[index])) for index in top]
+
+    def _popular(self, exclude, limit):
+        exclude = set(exclude.tolist())
+        picks = []
+        for row in self.popular:
+            game_id = int(self.game_ids[row])
+            if game_id not in exclude:
+                picks.append((game_id, None))
+                if len(picks) == limit:
+                    break
+        return picks
+
+
+class Recommender:
+    """Serves the current on-disk model, reloading it when a new build appears."""
+
+    def __init__(self, app=None):
+        self.directory = None
+        self.reload_seconds = DEFAULT_RELOAD_SECONDS
+        self._model = None
+        self._build = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.directory = app.config['RECOMMENDER_DIR']
+        self.reload_seconds = app.config.setdefault('RECOMMENDER_RELOAD_SECONDS', DEFAULT_RELOAD_SECONDS)
+        self.model()
+
+    def model(self):
+        if time.monotonic() - self._checked_at > self.reload_seconds or self._build is None:
+            with self._lock:
+                self._checked_at = time.monotonic()
+                build, meta = read_meta(self.directory)
+                if build is not None and build != self._build:
+                    self._model = Model(build, meta)
+                    self._build = build
+        return self._model
+
+    def for_player(self, player_id, limit):
+        """``(model, [(game_id, score), ...])`` for one player, or ``(None, None)`` without a model."""
+        model = self.model()
+        if model is None:
+            return None, None
+        rated = db.session.execute(
+            select(PlayerGame.game_id, PlayerGame.rating)
+            .where(PlayerGame.player_id == player_id, PlayerGame.rating.isnot(None))
+        ).all()
+        return model, model.recommend([game_id for game_id, _ in rated], [rating for _, rating in rated], limit)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the game recommendation model.")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--neighbors", type=int, default=DEFAULT_NEIGHBORS, help="similar games kept per game")
+    parser.add_argument("--min-new-ratings", type=int, default=0,
+                        help="skip the build unless this many reviews were added since the last one")
+    parser.add_argument("--block-memory-mb", type=int, default=DEFAULT_BLOCK_MEMORY // 2 ** 20,
+                        help="memory for each block of the similarity matrix, in MiB")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    from app import app
+
+    args = parse_args()
+    with app.app_context():
+        meta = build_model(db.session, app.config['RECOMMENDER_DIR'], args.neighbors, args.min_new_ratings,
+                           args.block_memory_mb * 2 ** 20)
+    print(json.dumps(meta) if meta else "Model is up to date, nothing to build.")
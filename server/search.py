@@ -0,0 +1,139 @@
+import html
+import re
+from sqlalchemy import DDL, event, literal, or_, text, union_all
+from models import db, metadata, Game, Category, Player, PlayerGame
+
+# One FTS5 index for every searchable entity. The rowid encodes the entity,
+# rowid = id * 4 + kind, so triggers update single rows without a scan.
+KINDS = {'game': 0, 'category': 1, 'player': 2, 'review': 3}
+
+GAME_TEXT = "{row}.title || ' ' || coalesce((SELECT category_name FROM categories WHERE category_id = {row}.category_id), '')"
+
+SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+    "kind UNINDEXED, ref_id UNINDEXED, text, tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+
+    f"""CREATE TRIGGER IF NOT EXISTS search_games_insert AFTER INSERT ON games BEGIN
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.game_id * 4, 'game', new.game_id, {GAME_TEXT.format(row='new')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS search_games_update AFTER UPDATE OF title, category_id ON games BEGIN
+        DELETE FROM search_index WHERE rowid = old.game_id * 4;
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.game_id * 4, 'game', new.game_id, {GAME_TEXT.format(row='new')});
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_games_delete AFTER DELETE ON games BEGIN
+        DELETE FROM search_index WHERE rowid = old.game_id * 4;
+    END""",
+
+    """CREATE TRIGGER IF NOT EXISTS search_categories_insert AFTER INSERT ON categories BEGIN
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.category_id * 4 + 1, 'category', new.category_id, new.category_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_categories_update AFTER UPDATE OF category_name ON categories BEGIN
+        DELETE FROM search_index WHERE rowid = old.category_id * 4 + 1;
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.category_id * 4 + 1, 'category', new.category_id, new.category_name);
+        DELETE FROM search_index WHERE rowid IN (SELECT game_id * 4 FROM games WHERE category_id = new.category_id);
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        SELECT game_id * 4, 'game', game_id, title || ' ' || new.category_name FROM games WHERE category_id = new.category_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_categories_delete AFTER DELETE ON categories BEGIN
+        DELETE FROM search_index WHERE rowid = old.category_id * 4 + 1;
+    END""",
+
+    """CREATE TRIGGER IF NOT EXISTS search_players_insert AFTER INSERT ON players BEGIN
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.player_id * 4 + 2, 'player', new.player_id, new.username);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_players_update AFTER UPDATE OF username ON players BEGIN
+        DELETE FROM search_index WHERE rowid = old.player_id * 4 + 2;
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.player_id * 4 + 2, 'player', new.player_id, new.username);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_players_delete AFTER DELETE ON players BEGIN
+        DELETE FROM search_index WHERE rowid = old.player_id * 4 + 2;
+    END""",
+
+    """CREATE TRIGGER IF NOT EXISTS search_reviews_insert AFTER INSERT ON player_games
+    WHEN new.review IS NOT NULL BEGIN
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        VALUES (new.id * 4 + 3, 'review', new.id, new.review);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_reviews_update AFTER UPDATE OF review ON player_games BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 3;
+        INSERT INTO search_index (rowid, kind, ref_id, text)
+        SELECT new.id * 4 + 3, 'review', new.id, new.review WHERE new.review IS NOT NULL;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_reviews_delete AFTER DELETE ON player_games BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 3;
+    END""",
+]
+
+# Used by db.create_all()/drop_all(); deployed databases get the same SQL from a migration
+for statement in SEARCH_DDL:
+    event.listen(metadata, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+event.listen(metadata, 'before_drop', DDL("DROP TABLE IF EXISTS search_index").execute_if(dialect='sqlite'))
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep Alembic autogenerate away from the FTS table and its shadow tables."""
+    return not (type_ == 'table' and name.startswith('search_index'))
+
+
+# Private-use characters FTS5 wraps matches in; the text is HTML-escaped before
+# they become <b> tags, so markup users wrote never reaches a client as markup
+MATCH_START, MATCH_END = '\ue000', '\ue001'
+
+
+def highlighted(text):
+    """``text`` HTML-escaped, with the FTS5 match markers turned into ``<b>`` tags."""
+    return html.escape(text).replace(MATCH_START, '<b>').replace(MATCH_END, '</b>')
+
+
+def match_expression(query):
+    """Turn free text into a safe FTS5 query: every word must match, the last as a prefix."""
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"' for word in words[:-1]) + (' ' if len(words) > 1 else '') + f'"{words[-1]}"*'
+
+
+def search(query, kind=None, limit=20, offset=0):
+    """Ranked hits as dicts with type, id, text and score.
+
+    ``text`` is HTML: escaped, with the matched words in ``<b>`` tags.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return _search_like(query, kind, limit, offset)
+    expression = match_expression(query)
+    if expression is None:
+        return []
+    sql = ("SELECT kind, ref_id, highlight(search_index, 2, :start, :end) AS text, bm25(search_index) AS rank "
+           "FROM search_index WHERE search_index MATCH :expression")
+    params = {'expression': expression, 'start': MATCH_START, 'end': MATCH_END, 'limit': limit, 'offset': offset}
+    if kind:
+        sql += " AND kind = :kind"
+        params['kind'] = kind
+    sql += " ORDER BY rank LIMIT :limit OFFSET :offset"
+    return [{'type': row.kind, 'id': row.ref_id, 'text': highlighted(row.text), 'score': -row.rank}
+            for row in db.session.execute(text(sql), params)]
+
+
+def _search_like(query, kind, limit, offset):
+    """Unranked substring search for databases without FTS5."""
+    pattern = f'%{query}%'
+    selects = {
+        'game': db.select(literal('game').label('kind'), Game.game_id.label('ref_id'), Game.title.label('text'))
+                .join(Category).where(or_(Game.title.ilike(pattern), Category.category_name.ilike(pattern))),
+        'category': db.select(literal('category'), Category.category_id, Category.category_name)
+                    .where(Category.category_name.ilike(pattern)),
+        'player': db.select(literal('player'), Player.player_id, Player.username)
+                  .where(Player.username.ilike(pattern)),
+        'review': db.select(literal('review'), PlayerGame.id, PlayerGame.review)
+                  .where(PlayerGame.review.ilike(pattern)),
+    }
+    chosen = [selects[kind]] if kind else list(selects.values())
+    hits = union_all(*chosen).subquery()
+    rows = db.session.execute(db.select(hits).order_by(hits.c.kind, hits.c.ref_id).limit(limit).offset(offset))
+    return [{'type': row.kind, 'id': row.ref_id, 'text': html.escape(row.text), 'score': None} for row in rows]
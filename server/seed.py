@@ -1,58 +1,205 @@
+import argparse
+import random
+from itertools import accumulate, islice
+from faker import Faker
+from werkzeug.security import generate_password_hash
 from app import app, db  # Import your Flask app instance and db from the main app file
-from models import Game, Category, Player, Country, PlayerGame  # Import your models
+from models import (Game, Category, Player, Country, PlayerGame, recompute_rating_aggregates,  # Import your models
+                    recompute_child_counts)
+from versioning import bump_table_versions
 
-def seed_database():
+DEFAULT_CHUNK_SIZE = 10000
+GENRES = ["Action", "RPG", "Strategy", "Adventure", "Shooter", "Puzzle", "Racing", "Sports",
+          "Simulation", "Platformer", "Fighting", "Horror", "Survival", "Sandbox", "Roguelike"]
+
+
+def seed_database(countries=None, categories=None, games=None, players=None, reviews=None,
+                  chunk_size=DEFAULT_CHUNK_SIZE, random_seed=0):
+    """Seed the sample data, or generate a synthetic dataset if any size is given."""
     with app.app_context():  # Create an application context
         # Drop and recreate all tables
         db.drop_all()
         db.create_all()
 
-        # Create sample countries
-        usa = Country(country_name="USA")
-        japan = Country(country_name="Japan")
-        germany = Country(country_name="Germany")
+        if all(size is None for size in (countries, categories, games, players, reviews)):
+            seed_sample_data()
+        else:
+            generate_data(countries or 50, categories or 20, games or 0, players or 0, reviews or 0,
+                          chunk_size, random_seed)
 
-        # Add countries to the session
-        db.session.add_all([usa, japan, germany])
-        db.session.commit()
+        print("Database seeded successfully!")
 
-        # Create sample categories
-        action = Category(category_name="Action")
-        rpg = Category(category_name="RPG")
-        strategy = Category(category_name="Strategy")
 
-        # Add categories to the session
-        db.session.add_all([action, rpg, strategy])
-        db.session.commit()
+def seed_sample_data():
+    # Create sample countries
+    usa = Country(country_name="USA")
+    japan = Country(country_name="Japan")
+    germany = Country(country_name="Germany")
 
-        # Create sample games
-        game1 = Game(title="Halo", release_year=2001, photo_url="https://example.com/halo.jpg", category=action)
-        game2 = Game(title="Final Fantasy VII", release_year=1997, photo_url="https://example.com/ff7.jpg", category=rpg)
-        game3 = Game(title="StarCraft", release_year=1998, photo_url="https://example.com/starcraft.jpg", category=strategy)
+    # Add countries to the session
+    db.session.add_all([usa, japan, germany])
+    db.session.commit()
 
-        # Add games to the session
-        db.session.add_all([game1, game2, game3])
-        db.session.commit()
+    # Create sample categories
+    action = Category(category_name="Action")
+    rpg = Category(category_name="RPG")
+    strategy = Category(category_name="Strategy")
 
-        # Create sample players
-        player1 = Player(username="gamer123", email="gamer123@example.com", country=usa)
-        player2 = Player(username="pro_player", email="pro@example.com", country=japan)
-        player3 = Player(username="casual_gamer", email="casual@example.com", country=germany)
+    # Add categories to the session
+    db.session.add_all([action, rpg, strategy])
+    db.session.commit()
 
-        # Add players to the session
-        db.session.add_all([player1, player2, player3])
-        db.session.commit()
+    # Create sample games
+    game1 = Game(title="Halo", release_year=2001, photo_url="https://example.com/halo.jpg", category=action)
+    game2 = Game(title="Final Fantasy VII", release_year=1997, photo_url="https://example.com/ff7.jpg", category=rpg)
+    game3 = Game(title="StarCraft", release_year=1998, photo_url="https://example.com/starcraft.jpg", category=strategy)
 
-        # Create sample player-game relationships (reviews and ratings)
-        player_game1 = PlayerGame(game=game1, player=player1, review="Amazing game!", rating=4.5)
-        player_game2 = PlayerGame(game=game2, player=player2, review="Classic RPG", rating=5.0)
-        player_game3 = PlayerGame(game=game3, player=player3, review="Great for strategy fans", rating=4.0)
+    # Add games to the session
+    db.session.add_all([game1, game2, game3])
+    db.session.commit()
 
-        # Add player-game relationships to the session
-        db.session.add_all([player_game1, player_game2, player_game3])
-        db.session.commit()
+    # Create sample players
+    player1 = Player(username="gamer123", email="gamer123@example.com", country=usa)
+    player2 = Player(username="pro_player", email="pro@example.com", country=japan)
+    player3 = Player(username="casual_gamer", email="casual@example.com", country=germany)
+
+    # Add players to the session
+    db.session.add_all([player1, player2, player3])
+    db.session.commit()
+
+    # Create sample player-game relationships (reviews and ratings)
+    player_game1 = PlayerGame(game=game1, player=player1, review="Amazing game!", rating=4.5)
+    player_game2 = PlayerGame(game=game2, player=player2, review="Classic RPG", rating=5.0)
+    player_game3 = PlayerGame(game=game3, player=player3, review="Great for strategy fans", rating=4.0)
+
+    # Add player-game relationships to the session
+    db.session.add_all([player_game1, player_game2, player_game3])
+    db.session.commit()
+
+
+def zipf_weights(n, s=1.1):
+    """Cumulative Zipf weights: item i is picked with probability ~ 1 / (i + 1) ** s."""
+    return list(accumulate(1 / (i + 1) ** s for i in range(n)))
+
+
+def insert_rows(model, rows, chunk_size):
+    """Insert a row generator with core executemany, one transaction per chunk."""
+    rows = iter(rows)
+    total = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return total
+        with db.engine.begin() as connection:
+            connection.execute(model.__table__.insert(), chunk)
+        total += len(chunk)
+        print(f"  {model.__tablename__}: {total:,}", end="\r", flush=True)
+
+
+def generate_data(countries, categories, games, players, reviews, chunk_size, random_seed):
+    """Stream a synthetic dataset with skewed popularity and activity.
+
+    Rows are generated lazily and inserted ``chunk_size`` at a time, so memory
+    stays flat whatever the sizes; only the per-entity weights are kept.
+    """
+    fake = Faker()
+    Faker.seed(random_seed)
+    rng = random.Random(random_seed)
+
+    if db.engine.dialect.name == 'sqlite':
+        with db.engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA journal_mode=WAL")
+
+    # Create countries and categories
+    country_names = list(dict.fromkeys(fake.country()[:24] for _ in range(countries * 4)))
+    insert_rows(Country, ({'country_name': country_names[i] if i < len(country_names) else f"Country {i + 1}"}
+                          for i in range(countries)), chunk_size)
+    insert_rows(Category, ({'category_name': GENRES[i] if i < len(GENRES) else f"Genre {i + 1}"}
+                           for i in range(categories)), chunk_size)
+
+    # A few categories and countries hold most of the games and players
+    category_weights = zipf_weights(categories)
+    country_weights = zipf_weights(countries)
+
+    def game_rows():
+        for i in range(games):
+            yield {
+                'title': f"{fake.catch_phrase()[:90]} {i + 1}",
+                'release_year': rng.randint(1980, 2025),
+                'photo_url': f"https://example.com/games/{i + 1}.jpg",
+                'category_id': rng.choices(range(1, categories + 1), cum_weights=category_weights)[0],
+                'rating_count': 0,
+                'rating_sum': 0.0,
+            }
+
+    # Every generated player gets the same password so they can log in
+    password_hash = generate_password_hash("password")
+
+    def player_rows():
+        for i in range(players):
+            username = f"{fake.user_name()[:20]}{i + 1}"
+            yield {
+                'username': username,
+                'email': f"{username}@{fake.free_email_domain()}",
+                'country_id': rng.choices(range(1, countries + 1), cum_weights=country_weights)[0],
+                'password_hash': password_hash,
+            }
+
+    insert_rows(Game, game_rows(), chunk_size)
+    insert_rows(Player, player_rows(), chunk_size)
+
+    # Review counts follow a Zipf curve over players, games are picked by popularity
+    review_texts = [fake.sentence()[:255] for _ in range(1000)]
+    game_weights = zipf_weights(games) if games else []
+    player_weights = zipf_weights(players) if players else []
+    total_weight = player_weights[-1] if player_weights else 0
+
+    def review_rows():
+        remaining = reviews
+        previous = 0.0
+        for player_id, cumulative in enumerate(player_weights, start=1):
+            if remaining <= 0:
+                return
+            # Spread what is left over the remaining players, so capped players don't shrink the total
+            expected = remaining * (cumulative - previous) / (total_weight - previous)
+            previous = cumulative
+            count = min(int(expected) + (rng.random() < expected % 1), games, remaining)
+            reviewed = set(rng.choices(range(1, games + 1), cum_weights=game_weights, k=count))
+            # Top up with uniform picks when popular games were drawn twice
+            while len(reviewed) < count:
+                reviewed.add(rng.randint(1, games))
+            remaining -= count
+            for game_id in reviewed:
+                yield {
+                    'player_id': player_id,
+                    'game_id': game_id,
+                    'review': rng.choice(review_texts),
+                    'rating': rng.choice((1.0, 2.0, 3.0, 3.5, 4.0, 4.0, 4.5, 4.5, 5.0, 5.0)),
+                }
+
+    insert_rows(PlayerGame, review_rows(), chunk_size)
+    print()
+
+    # Bulk inserts skip the ORM hooks, so rebuild what they would have maintained
+    recompute_rating_aggregates(db.session)
+    recompute_child_counts(db.session)
+    bump_table_versions(db.session, {'countries', 'categories', 'games', 'players', 'player_games'})
+    db.session.commit()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Seed the database with sample or synthetic data.")
+    parser.add_argument("--countries", type=int, help="number of countries (default 50 when generating)")
+    parser.add_argument("--categories", type=int, help="number of categories (default 20 when generating)")
+    parser.add_argument("--games", type=int, help="number of games, e.g. 100_000")
+    parser.add_argument("--players", type=int, help="number of players, e.g. 1_000_000")
+    parser.add_argument("--reviews", type=int, help="approximate number of reviews, e.g. 20_000_000")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per insert batch")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    return parser.parse_args()
 
-        print("Database seeded successfully!")
 
 if __name__ == "__main__":
-    seed_database()
+    args = parse_args()
+    seed_database(args.countries, args.categories, args.games, args.players, args.reviews,
+                  args.chunk_size, args.seed)
@@ -0,0 +1,163 @@
+"""Response shapes read straight from SQL rows.
+
+A ``Schema`` lists a resource's output fields as column expressions. For a
+set of fields it builds a ``select()`` of exactly those columns, joining in
+related tables only when a field needs them, and a mapper that turns each
+result row into the output dict. No ORM objects are built on the read path,
+and each mapper is built once per field list and reused.
+"""
+from sqlalchemy import Column, case, select
+from sqlalchemy.sql import visitors
+from models import Game, Player, PlayerGame, Category, Country
+
+
+def make_mapper(names):
+    """``row -> {name: row[0], ...}`` for ``names``.
+
+    Columns after the named ones, such as cursor keys, are ignored.
+    """
+    return lambda row: dict(zip(names, row))
+
+
+class Schema:
+    """The output fields of one resource and the SQL that reads them.
+
+    ``fields`` maps each output field to a column expression. ``joins`` lists
+    the relationships that reach other tables, in join order; each is
+    outer-joined only if a selected field (or a later join) needs its table.
+    """
+
+    def __init__(self, model, fields, joins=()):
+        self.model = model
+        self.fields = fields
+        self.joins = joins
+        self._mappers = {}
+
+    def select(self, names=None, extra=()):
+        """``select()`` of the ``names`` fields, labelled by name, then the ``extra`` columns.
+
+        ``extra`` columns, such as the keys a cursor is built from, must come
+        from the schema's own table; they are labelled by their key.
+        """
+        names = tuple(self.fields if names is None else names)
+        columns = [self.fields[name].label(name) for name in names]
+        statement = select(*columns, *(column.label(column.key) for column in extra)).select_from(self.model)
+        for relationship in self._needed_joins(columns):
+            statement = statement.outerjoin(relationship)
+        return statement
+
+    def mapper(self, names=None):
+        """The row-to-dict function for rows of ``select(names)``."""
+        names = tuple(self.fields if names is None else names)
+        mapper = self._mappers.get(names)
+        if mapper is None:
+            mapper = self._mappers[names] = make_mapper(names)
+        return mapper
+
+    def _needed_joins(self, columns):
+        tables = {table for column in columns for table in _tables(column)}
+        needed = []
+        for relationship in reversed(self.joins):
+            if relationship.property.mapper.local_table in tables:
+                needed.insert(0, relationship)
+                tables.add(relationship.property.parent.local_table)
+        return needed
+
+
+def _tables(expression):
+    """The tables whose columns ``expression`` reads."""
+    return {element.table for element in visitors.iterate(expression) if isinstance(element, Column)}
+
+
+# Average rating, NULL until the game has been rated
+avg_rating = case((Game.rating_count > 0, Game.rating_sum / Game.rating_count))
+
+game_schema = Schema(
+    Game,
+    fields={
+        'game_id': Game.game_id,
+        'title': Game.title,
+        'release_year': Game.release_year,
+        'photo_url': Game.photo_url,
+        'category': Category.category_name,
+        'rating_count': Game.rating_count,
+        'rating_sum': Game.rating_sum,
+        'avg_rating': avg_rating,
+    },
+    joins=(Game.category,),
+)
+
+player_schema = Schema(
+    Player,
+    fields={
+        'player_id': Player.player_id,
+        'username': Player.username,
+        'email': Player.email,
+        'country': Country.country_name,
+        'password_hash': Player.password_hash,
+    },
+    joins=(Player.country,),
+)
+
+player_game_schema = Schema(
+    PlayerGame,
+    fields={
+        'id': PlayerGame.id,
+        'game': Game.title,
+        'player': Player.username,
+        'review': PlayerGame.review,
+        'rating': PlayerGame.rating,
+    },
+    joins=(PlayerGame.game, PlayerGame.player),
+)
+
+category_schema = Schema(
+    Category,
+    fields={
+        'category_id': Category.category_id,
+        'category_name': Category.category_name,
+        'game_count': Category.game_count,
+    },
+)
+
+country_schema = Schema(
+    Country,
+    fields={
+        'country_id': Country.country_id,
+        'country_name': Country.country_name,
+        'player_count': Country.player_count,
+    },
+)
+
+# One player's reviews with their game and category
+player_library_schema = Schema(
+    PlayerGame,
+    fields={
+        'id': PlayerGame.id,
+        'game_id': PlayerGame.game_id,
+        'game': Game.title,
+        'release_year': Game.release_year,
+        'photo_url': Game.photo_url,
+        'category_id': Game.category_id,
+        'category': Category.category_name,
+        'review': PlayerGame.review,
+        'rating': PlayerGame.rating,
+    },
+    joins=(PlayerGame.game, Game.category),
+)
+
+# Fields shown for the children on a category or country page
+CATEGORY_GAME_FIELDS = ('game_id', 'title', 'release_year', 'photo_url')
+COUNTRY_PLAYER_FIELDS = ('player_id', 'username')
+
+
+def category_detail(category, games):
+    """A category row with one page of its game rows."""
+    serialize_game = game_schema.mapper(CATEGORY_GAME_FIELDS)
+    return {**category_schema.mapper()(category), 'games': [serialize_game(game) for game in games]}
+
+
+def country_detail(country, players):
+    """A country row with one page of its player rows."""
+    serialize_player = player_schema.mapper(COUNTRY_PLAYER_FIELDS)
+    return {**country_schema.mapper()(country), 'players': [serialize_player(player) for player in players]}
@@ -0,0 +1,31 @@
+from flask import Response, current_app, request, stream_with_context
+from models import db
+from pagination import ordering
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+STREAM_BATCH_SIZE = 1000
+
+
+def wants_stream():
+    """True if the client asked for NDJSON via ``?stream=1`` or the Accept header."""
+    if request.args.get('stream') == '1':
+        return True
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def stream_rows(statement, key, serialize, sort=None, descending=False):
+    """Stream every row of the ``select()`` ``statement`` as one JSON document per line.
+
+    Rows are fetched ``STREAM_BATCH_SIZE`` at a time with ``yield_per`` and
+    written as they are serialized, so memory stays flat whatever the row count.
+    """
+    rows = db.session.execute(statement.order_by(*ordering(key, sort, descending))
+                              .execution_options(yield_per=STREAM_BATCH_SIZE))
+    dumps = current_app.json.dumps
+
+    def generate():
+        for row in rows:
+            yield dumps(serialize(row), separators=(',', ':')) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
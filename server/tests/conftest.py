@@ -0,0 +1,69 @@
+import os
+import sys
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+# config reads the database URL at import time
+os.environ['DB_URI'] = 'sqlite://'
+os.environ['LOG_REQUESTS'] = '0'
+os.environ['LOG_ASYNC'] = '0'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app as flask_app, response_cache, leaderboards  # noqa: E402
+from cache import MemoryBackend  # noqa: E402
+from models import db  # noqa: E402
+import seed  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    """The app on an empty in-memory database, with an empty response cache."""
+    response_cache.backend = MemoryBackend()
+    response_cache.enabled = True
+    leaderboards._rankings = None
+    leaderboards.invalidate()
+    with flask_app.app_context():
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def generate(app):
+    """Replace the data with ``seed.generate_data`` at the given sizes."""
+    def generate(countries=5, categories=5, games=0, players=0, reviews=0):
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        seed.generate_data(countries, categories, games, players, reviews,
+                           chunk_size=seed.DEFAULT_CHUNK_SIZE, random_seed=0)
+    return generate
+
+
+@pytest.fixture
+def count_statements(app):
+    """``with count_statements() as statements:`` collects the SQL run inside the block.
+
+    With ``parameters=True`` each entry is a ``(statement, parameters)`` pair.
+    """
+    @contextmanager
+    def count_statements(parameters=False):
+        statements = []
+
+        def record(conn, cursor, statement, params, context, executemany):
+            statements.append((statement, params) if parameters else statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    return count_statements
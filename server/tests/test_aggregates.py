@@ -0,0 +1,110 @@
+from sqlalchemy import func, select
+from app import response_cache
+from models import db, Game, Player, Country, Category, PlayerGame, CHILD_COUNTS
+
+
+def rating_aggregates():
+    """``{game_id: (rating_count, rating_sum)}`` as stored and as counted from the reviews."""
+    stored = db.session.execute(select(Game.game_id, Game.rating_count, Game.rating_sum))
+    counted = db.session.execute(
+        select(Game.game_id, func.count(PlayerGame.rating), func.coalesce(func.sum(PlayerGame.rating), 0.0))
+        .outerjoin(PlayerGame)
+        .group_by(Game.game_id)
+    )
+    return ({game_id: (count, total) for game_id, count, total in stored},
+            {game_id: (count, total) for game_id, count, total in counted})
+
+
+def assert_aggregates_match():
+    db.session.expire_all()
+    stored, counted = rating_aggregates()
+    assert stored == counted
+
+
+def unreviewed_pair():
+    reviewed = {tuple(pair) for pair in db.session.execute(select(PlayerGame.player_id, PlayerGame.game_id))}
+    players = db.session.scalars(select(Player.player_id)).all()
+    games = db.session.scalars(select(Game.game_id)).all()
+    return next((player_id, game_id) for player_id in players for game_id in games
+                if (player_id, game_id) not in reviewed)
+
+
+def test_rating_aggregates_follow_every_write_path(client, generate):
+    generate(games=10, players=10, reviews=40)
+    assert_aggregates_match()
+
+    player_id, game_id = unreviewed_pair()
+    response = client.post('/player_games', json={'player_id': player_id, 'game_id': game_id, 'rating': 4.5})
+    assert response.status_code == 201
+    assert_aggregates_match()
+
+    review_id = response.get_json()['id']
+    assert client.patch(f'/player_games/{review_id}', json={'rating': 2.0}).status_code == 200
+    assert_aggregates_match()
+    assert client.patch(f'/player_games/{review_id}', json={'rating': None}).status_code == 200
+    assert_aggregates_match()
+
+    player_id, game_id = unreviewed_pair()
+    response = client.post('/player_games/bulk', json=[{'player_id': player_id, 'game_id': game_id, 'rating': 3.0}])
+    assert response.status_code == 201
+    assert_aggregates_match()
+
+    db.session.delete(db.session.scalars(select(PlayerGame).where(PlayerGame.rating.isnot(None))).first())
+    db.session.commit()
+    assert_aggregates_match()
+
+    # ON DELETE CASCADE removes their reviews without loading them
+    db.session.delete(db.session.get(Player, 1))
+    db.session.commit()
+    assert_aggregates_match()
+
+    db.session.delete(db.session.get(Country, 1))
+    db.session.commit()
+    assert_aggregates_match()
+
+
+def assert_child_counts_match():
+    db.session.expire_all()
+    for child, key, _, parent_model, counter in CHILD_COUNTS:
+        parent_key = parent_model.__table__.primary_key.columns[0]
+        stored = dict(db.session.execute(select(parent_key, getattr(parent_model, counter))).all())
+        counted = dict(db.session.execute(
+            select(parent_key, func.count(getattr(child, key))).select_from(parent_model)
+            .outerjoin(child).group_by(parent_key)
+        ).all())
+        assert stored == counted, counter
+
+
+def test_child_counts_and_their_list_caches_follow_every_write_path(client, generate):
+    generate(games=10, players=10, reviews=20)
+    assert_child_counts_match()
+
+    def check(write, url, namespace):
+        """Run ``write``, then check the counts and that ``url`` and the ``namespace`` list were invalidated."""
+        tag = f'gen:{namespace}:list'
+        etag = client.get(url).headers['ETag']
+        generation, = response_cache.backend.counters([tag])
+        write()
+        assert_child_counts_match()
+        assert response_cache.backend.counters([tag]) == [generation + 1]
+        response = client.get(url)
+        assert (response.headers['ETag'] != etag, response.headers['X-Cache']) == (True, 'MISS')
+
+    check(lambda: client.post('/games', json={'title': 'Portal', 'category_id': 1}), '/categories', 'categories')
+    check(lambda: client.post('/games/bulk', json=[{'title': 'Braid', 'category_id': 2}]), '/categories', 'categories')
+    moved = db.session.get(Game, 1)
+    check(lambda: client.patch('/games/1', json={'category_id': moved.category_id % 5 + 1}), '/categories', 'categories')
+    check(lambda: client.delete('/games/2'), '/categories', 'categories')
+    check(lambda: client.post('/players', json={'username': 'new', 'email': 'new@example.com', 'password': 'pw',
+                                                'country_id': 1}), '/countries', 'countries')
+    moved = db.session.get(Player, 1)
+    check(lambda: client.patch('/players/1', json={'country_id': moved.country_id % 5 + 1}), '/countries', 'countries')
+
+    def delete(model, key):
+        db.session.delete(db.session.get(model, key))
+        db.session.commit()
+
+    check(lambda: delete(Player, 2), '/countries', 'countries')
+    # ON DELETE CASCADE takes a category's games and a country's players with it
+    check(lambda: delete(Category, 1), '/categories', 'categories')
+    check(lambda: delete(Country, 1), '/countries', 'countries')
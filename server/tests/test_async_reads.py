@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import pytest
+from app import response_cache
+from async_reads import AsyncReads
+from cache import MemoryBackend
+from models import db
+from streaming import NDJSON_MIMETYPE
+
+URLS = [
+    '/games?limit=3', '/games/5', '/games/99999', '/games?limit=2&sort=-release_year&fields=title,release_year',
+    '/games?stream=1&fields=title', '/games?sort=bogus',
+    '/categories', '/categories/1?limit=2', '/categories/999', '/categories?stream=1',
+    '/countries?limit=2', '/countries/2?limit=3', '/countries/999', '/countries?stream=1',
+    '/player_games?limit=3&sort=-rating', '/player_games/7', '/player_games/99999', '/player_games?stream=1&limit=2',
+]
+
+
+async def asgi_get(application, url):
+    """``(status, headers, body)`` of a GET sent straight to the ASGI ``application``."""
+    path, _, query = url.partition('?')
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query.encode(),
+             'headers': [], 'scheme': 'http'}
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    headers = {name.decode(): value.decode() for name, value in messages[0]['headers']}
+    return messages[0]['status'], headers, b''.join(message.get('body', b'') for message in messages[1:])
+
+
+@pytest.fixture
+def async_reads(app, generate, tmp_path, monkeypatch):
+    """AsyncReads over a file copy of the generated database."""
+    generate(games=20, players=20, reviews=100)
+    copy = tmp_path / 'app.db'
+    db.session.connection().exec_driver_sql(f"VACUUM INTO '{copy}'")
+    monkeypatch.setenv('ASYNC_DB_URI', f'sqlite+aiosqlite:///{copy}')
+    # Both servers render every response themselves
+    response_cache.enabled = False
+    return AsyncReads(app)
+
+
+def test_both_servers_answer_alike(client, async_reads):
+    async def get_all():
+        try:
+            return [await asgi_get(async_reads, url) for url in URLS]
+        finally:
+            await async_reads.engine.dispose()
+
+    for url, (status, headers, body) in zip(URLS, asyncio.run(get_all())):
+        response = client.get(url)
+        assert (status, body) == (response.status_code, response.data), url
+        for name in ('content-type', 'etag', 'x-next-cursor'):
+            assert headers.get(name) == response.headers.get(name), (url, name)
+
+
+class BlockingBackend(MemoryBackend):
+    """A memory backend flagged as blocking, which records the threads calling it."""
+
+    blocking = True
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return super().get(key)
+
+    def set(self, key, value, ttl=None):
+        self.threads.add(threading.get_ident())
+        super().set(key, value, ttl)
+
+
+def test_blocking_cache_backends_are_called_off_the_event_loop(async_reads):
+    response_cache.enabled = True
+    response_cache.backend = backend = BlockingBackend()
+
+    async def get_twice():
+        try:
+            loop_thread = threading.get_ident()
+            responses = [await asgi_get(async_reads, '/games/5') for _ in range(2)]
+            return loop_thread, responses
+        finally:
+            await async_reads.engine.dispose()
+
+    loop_thread, (first, second) = asyncio.run(get_twice())
+    assert (first[1]['x-cache'], second[1]['x-cache']) == ('MISS', 'HIT')
+    assert first[2] == second[2]
+    assert backend.threads and loop_thread not in backend.threads
+
+
+def test_listings_stream_on_the_sync_server(client, generate):
+    generate()
+    for url in ('/categories?stream=1', '/countries?stream=1'):
+        response = client.get(url)
+        assert response.mimetype == NDJSON_MIMETYPE, url
+        assert len(response.data.splitlines()) == 5, url
@@ -0,0 +1,74 @@
+import pytest
+from models import db, Category, Country, Game, Player, PlayerGame
+
+
+@pytest.fixture
+def catalog(app):
+    db.session.add_all([Country(country_id=1, country_name='Chile'), Category(category_id=1, category_name='Puzzle')])
+    db.session.add_all([Game(game_id=1, title='Portal', category_id=1),
+                        Player(player_id=1, username='ana', email='ana@example.com', country_id=1),
+                        Player(player_id=2, username='ben', email='ben@example.com', country_id=1)])
+    db.session.commit()
+
+
+def statuses(response):
+    return [result.get('message', result['status']) for result in response.get_json()['results']]
+
+
+def test_valid_games_are_created(client, catalog):
+    response = client.post('/games/bulk', json=[{'title': 'Braid', 'category_id': 1},
+                                                 {'title': 'Fez', 'category_id': 1, 'release_year': 2012}])
+    assert response.status_code == 201
+    body = response.get_json()
+    assert (body['created'], body['failed']) == (2, 0)
+    ids = [result['game_id'] for result in body['results']]
+    assert [db.session.get(Game, game_id).title for game_id in ids] == ['Braid', 'Fez']
+
+
+def test_invalid_games_get_per_item_errors(client, catalog):
+    response = client.post('/games/bulk', json=[
+        {'title': 'Braid', 'category_id': 1},
+        {'title': ['Braid'], 'category_id': 1},
+        {'title': 'Fez', 'category_id': True},
+        {'title': 'Fez', 'category_id': 9},
+        {'title': 'Fez', 'category_id': 1, 'release_year': '2012'},
+        {'title': 'Fez', 'category_id': 1, 'photo_url': {'src': 'x'}},
+        {'category_id': 1},
+        'Fez',
+    ])
+    assert response.status_code == 207
+    assert statuses(response) == [
+        'created', 'title must be a string', 'category_id must be an integer', 'Category not found',
+        'release_year must be an integer', 'photo_url must be a string', 'Title and category_id are required',
+        'Title and category_id are required',
+    ]
+    assert response.get_json()['created'] == 1
+
+
+def test_invalid_reviews_get_per_item_errors(client, catalog):
+    db.session.add(PlayerGame(player_id=2, game_id=1))
+    db.session.commit()
+    response = client.post('/player_games/bulk', json=[
+        {'player_id': 1, 'game_id': 1, 'rating': 4.0},
+        {'player_id': 1, 'game_id': 1},
+        {'player_id': 2, 'game_id': [1]},
+        {'player_id': True, 'game_id': 1},
+        {'player_id': 1, 'game_id': 9},
+        {'player_id': 9, 'game_id': 1},
+        {'player_id': 2, 'game_id': 1},
+        {'player_id': 1, 'game_id': 1, 'rating': 'five'},
+        {'player_id': 1, 'game_id': 1, 'review': 5},
+        {'player_id': 1},
+    ])
+    assert response.status_code == 207
+    assert statuses(response) == [
+        'created', 'Player has already reviewed this game', 'game_id must be an integer',
+        'player_id must be an integer', 'Game not found', 'Player not found', 'Player has already reviewed this game',
+        'rating must be a number', 'review must be a string', 'Missing required fields (game_id, player_id)',
+    ]
+    assert db.session.get(Game, 1).rating_count == 1
+
+
+@pytest.mark.parametrize('body', [{'title': 'Braid'}, 'games'])
+def test_body_must_be_an_array(client, catalog, body):
+    assert client.post('/games/bulk', json=body).status_code == 400
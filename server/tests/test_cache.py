@@ -0,0 +1,64 @@
+from datetime import datetime, timezone
+import versioning
+from cache import MemoryBackend
+from models import db
+from versioning import bump_table_versions
+
+
+def test_memory_backend_never_evicts_counters():
+    backend = MemoryBackend(max_entries=2)
+    backend.incr('gen:games')
+    backend.incr('gen:games')
+    for index in range(10):
+        backend.set(f'response:{index}', b'body')
+    assert backend.counters(['gen:games', 'gen:players']) == [2, 0]
+    assert backend.get('response:0') is None
+
+
+def test_cached_list_misses_after_a_write_from_another_worker(client, generate):
+    generate(games=3)
+    assert client.get('/games').headers['X-Cache'] == 'MISS'
+    assert client.get('/games').headers['X-Cache'] == 'HIT'
+
+    # Another worker's commit bumps the shared table versions but none of this process's tags
+    bump_table_versions(db.session, {'games'})
+    db.session.commit()
+
+    assert client.get('/games').headers['X-Cache'] == 'MISS'
+
+
+def test_reviews_are_cached_and_validated_like_the_catalog(client, generate):
+    generate(games=3, players=3, reviews=5)
+    first = client.get('/player_games/1')
+    assert first.headers['X-Cache'] == 'MISS'
+    assert client.get('/player_games/1').headers['X-Cache'] == 'HIT'
+    assert client.get('/player_games/1', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    # Renaming the game changes the review's body
+    client.patch('/games/1', json={'title': 'Renamed'})
+    listed = client.get('/player_games?game_id=1')
+    assert listed.headers['X-Cache'] == 'MISS'
+    assert {row['game'] for row in listed.get_json()} == {'Renamed'}
+
+
+def test_write_in_the_same_second_is_not_hidden_by_if_modified_since(client, generate, monkeypatch):
+    def at(seconds):
+        monkeypatch.setattr(versioning, '_now', lambda: datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+                            .replace(second=int(seconds), microsecond=round(seconds % 1 * 1e6)))
+
+    at(0.2)
+    generate(games=3)
+    at(0.5)
+    assert 'Last-Modified' not in client.get('/games/1').headers
+    since = {'If-Modified-Since': 'Mon, 01 Jan 2024 12:00:00 GMT'}
+
+    at(0.8)
+    client.patch('/games/1', json={'title': 'Renamed'})
+    changed = client.get('/games/1', headers=since)
+    assert changed.status_code == 200
+    assert changed.get_json()['title'] == 'Renamed'
+
+    # Once the second is over no write can share it
+    at(1.5)
+    assert client.get('/games/1').headers['Last-Modified'] == since['If-Modified-Since']
+    assert client.get('/games/1', headers=since).status_code == 304
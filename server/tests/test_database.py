@@ -0,0 +1,31 @@
+import sqlite3
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+import database
+from models import db, Game
+
+
+def test_locked_write_is_retried_once_after_a_rollback(client, generate, monkeypatch):
+    generate()
+    calls = []
+    commit, rollback = db.session.commit, db.session.rollback
+
+    def locked_once():
+        calls.append('commit')
+        if calls.count('commit') == 1:
+            raise OperationalError('COMMIT', {}, sqlite3.OperationalError('database is locked'))
+        commit()
+
+    def rolled_back():
+        calls.append('rollback')
+        rollback()
+
+    monkeypatch.setattr(db.session, 'commit', locked_once)
+    monkeypatch.setattr(db.session, 'rollback', rolled_back)
+    monkeypatch.setattr(database.time, 'sleep', lambda seconds: None)
+
+    response = client.post('/games', json={'title': 'Portal', 'category_id': 1})
+    assert response.status_code == 200
+    assert calls == ['commit', 'rollback', 'commit']
+    # The first attempt's pending game was discarded, not inserted twice
+    assert db.session.scalar(db.select(func.count()).where(Game.title == 'Portal')) == 1
@@ -0,0 +1,43 @@
+import logging
+import re
+from app import request_metrics
+
+
+def metric(client, name, **labels):
+    """The value of ``name`` on /metrics for the series with ``labels``, 0 if there is none."""
+    text = client.get('/metrics').get_data(as_text=True)
+    for line in text.splitlines():
+        match = re.fullmatch(rf'{name}\{{(.*)\}} (\S+)', line)
+        if match and all(f'{key}="{value}"' in match.group(1) for key, value in labels.items()):
+            return float(match.group(2))
+    return 0
+
+
+def test_responses_carry_server_timing(client, generate):
+    generate(games=3)
+    timing = client.get('/games').headers['Server-Timing']
+    assert re.fullmatch(r'db;dur=[\d.]+;desc="[1-9]\d* queries", serialize;dur=[\d.]+, total;dur=[\d.]+', timing), timing
+
+
+def test_metrics_count_requests_and_queries(client, generate):
+    generate(games=3)
+    labels = {'endpoint': 'gameresource', 'method': 'GET', 'status': '404'}
+    requests = metric(client, 'http_request_duration_seconds_count', **labels)
+    queries = metric(client, 'http_request_db_queries_total', **labels)
+
+    assert client.get('/games/999').status_code == 404
+    assert metric(client, 'http_request_duration_seconds_count', **labels) == requests + 1
+    assert metric(client, 'http_request_db_queries_total', **labels) > queries
+
+    response = client.get('/metrics')
+    assert response.mimetype == 'text/plain'
+    assert '# TYPE http_request_duration_seconds histogram' in response.get_data(as_text=True)
+
+
+def test_slow_queries_are_logged_with_their_request(client, generate, monkeypatch, caplog):
+    generate(games=3)
+    monkeypatch.setattr(request_metrics, 'slow_query_seconds', 0)
+    with caplog.at_level(logging.WARNING, logger='slow_query'):
+        client.get('/games/1')
+    messages = [record.getMessage() for record in caplog.records if record.name == 'slow_query']
+    assert any(re.match(r'slow query [\d.]+ ms in GET \w+: SELECT ', message) for message in messages), messages
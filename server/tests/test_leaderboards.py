@@ -0,0 +1,43 @@
+import pytest
+from app import leaderboards
+from models import db, PlayerGame
+
+
+@pytest.fixture
+def no_debounce(app):
+    leaderboards.debounce_seconds = 0
+    yield
+    leaderboards.debounce_seconds = app.config['LEADERBOARD_DEBOUNCE_SECONDS']
+
+
+def wait_for_rebuild():
+    thread = leaderboards._rebuild_thread
+    if thread is not None:
+        thread.join(5)
+
+
+def test_reads_serve_previous_rankings_while_rebuilding(client, generate, no_debounce):
+    generate(games=3, players=3)
+    assert client.get('/leaderboards/games').get_json()['games'] == []
+
+    response = client.post('/player_games', json={'player_id': 1, 'game_id': 2, 'rating': 5.0})
+    assert response.status_code == 201
+
+    # The committed review schedules a rebuild; this read still gets the old rankings
+    assert client.get('/leaderboards/games').get_json()['games'] == []
+    wait_for_rebuild()
+    games = client.get('/leaderboards/games').get_json()['games']
+    assert [game['game_id'] for game in games] == [2]
+
+
+def test_rolled_back_writes_do_not_invalidate(client, generate, no_debounce):
+    generate(games=3, players=3)
+    client.get('/leaderboards/games')
+
+    db.session.add(PlayerGame(player_id=1, game_id=2, rating=5.0))
+    db.session.flush()
+    db.session.rollback()
+
+    assert not leaderboards._stale
+    client.get('/leaderboards/games')
+    assert leaderboards._rebuild_thread is None
@@ -0,0 +1,70 @@
+import pytest
+from app import login_limiter
+from models import db, Country, Player, hash_password
+
+FAST_HASH = 'pbkdf2:sha256:1000'
+
+
+@pytest.fixture
+def player(app):
+    """A player ``ana`` with password ``secret``, and fresh login buckets."""
+    app.config['PASSWORD_HASH_METHOD'] = FAST_HASH
+    login_limiter.init_app(app)
+    db.session.add(Country(country_id=1, country_name='Chile'))
+    db.session.add(Player(player_id=1, username='ana', email='ana@example.com', country_id=1,
+                          password_hash=hash_password('secret')))
+    db.session.commit()
+    yield
+    app.config['PASSWORD_HASH_METHOD'] = None
+
+
+def login(client, username='ana', password='secret'):
+    return client.post('/login', json={'username': username, 'password': password})
+
+
+def test_login_returns_a_token(client, player):
+    response = login(client)
+    assert response.status_code == 200
+    assert response.get_json()['user'] == {'username': 'ana', 'email': 'ana@example.com'}
+    assert response.get_json()['access_token']
+    assert login(client, password='wrong').status_code == 401
+    assert login(client, username='nobody').status_code == 401
+
+
+@pytest.mark.parametrize('body', [{'username': 1, 'password': 'secret'}, {'username': 'ana', 'password': ['x']},
+                                  {'username': 'ana'}, ['ana', 'secret']])
+def test_malformed_bodies_are_rejected(client, player, body):
+    assert client.post('/login', json=body).status_code == 400
+
+
+def test_failed_logins_are_throttled_per_username(client, player, app):
+    for _ in range(app.config['LOGIN_USERNAME_BURST']):
+        assert login(client, password='wrong').status_code == 401
+    response = login(client, username='ANA')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+
+
+def test_successful_logins_do_not_use_up_the_username_budget(client, player, app):
+    for _ in range(app.config['LOGIN_USERNAME_BURST'] * 2):
+        assert login(client).status_code == 200
+
+
+def test_logins_are_throttled_per_ip(client, player, app):
+    for index in range(app.config['LOGIN_IP_BURST']):
+        login(client, username=f'user{index}')
+    response = login(client)
+    assert response.status_code == 429
+    assert 'Retry-After' in response.headers
+
+
+def test_hash_is_upgraded_on_login(client, player, app):
+    app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:2000'
+    assert db.session.get(Player, 1).needs_rehash()
+    assert login(client).status_code == 200
+
+    db.session.expire_all()
+    player = db.session.get(Player, 1)
+    assert player.password_hash.startswith('pbkdf2:sha256:2000$')
+    assert not player.needs_rehash()
+    assert login(client).status_code == 200
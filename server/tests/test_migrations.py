@@ -0,0 +1,76 @@
+import ast
+import glob
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+from models import db
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def flask_db(database, *args):
+    """Run ``flask db ...`` against the SQLite file ``database``."""
+    env = {**os.environ, 'DB_URI': f'sqlite:///{database}', 'FLASK_APP': 'app'}
+    result = subprocess.run([sys.executable, '-m', 'flask', 'db', *args],
+                            cwd=SERVER_DIR, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def search_schema(connection):
+    """``{name: sql}`` of the FTS table and its triggers, whitespace normalized."""
+    rows = connection.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' OR name = 'search_index'")
+    normalized = {}
+    for name, sql in rows:
+        sql = re.sub(r'\s+', ' ', sql)
+        normalized[name] = re.sub(r'\( ', '(', re.sub(r' \)', ')', sql))
+    return normalized
+
+
+@pytest.mark.parametrize('path', sorted(glob.glob(os.path.join(SERVER_DIR, 'migrations', 'versions', '*.py'))),
+                         ids=os.path.basename)
+def test_migrations_import_nothing_from_the_app(path):
+    # A migration must keep doing what it did when it was written, whatever the app code says now
+    with open(path) as file:
+        tree = ast.parse(file.read())
+    modules = {alias.name for node in ast.walk(tree) if isinstance(node, ast.Import) for alias in node.names}
+    modules |= {node.module for node in ast.walk(tree) if isinstance(node, ast.ImportFrom)}
+    assert {module.split('.')[0] for module in modules} <= {'alembic', 'sqlalchemy'}
+
+
+def test_upgrade_matches_models_and_downgrades(tmp_path):
+    database = tmp_path / 'app.db'
+    flask_db(database, 'upgrade')
+    flask_db(database, 'check')
+    flask_db(database, 'downgrade', 'base')
+
+
+def test_unique_review_index_keeps_first_review(tmp_path):
+    database = tmp_path / 'app.db'
+    flask_db(database, 'upgrade', '1b3e9cefd684')
+    with sqlite3.connect(database) as connection:
+        connection.executemany(
+            'INSERT INTO player_games (id, game_id, player_id, review) VALUES (?, ?, ?, ?)',
+            [(1, 1, 1, 'first'), (2, 1, 1, 'second'), (3, 2, 1, 'other game')])
+
+    flask_db(database, 'upgrade', '4c2f8e1a9b07')
+
+    with sqlite3.connect(database) as connection:
+        rows = connection.execute('SELECT id, review FROM player_games ORDER BY id').fetchall()
+    assert rows == [(1, 'first'), (3, 'other game')]
+
+
+# Revisions that (re)create the search DDL, which has not changed since
+@pytest.mark.parametrize('revision', ['d3f6a2b8c4e1', 'head'])
+def test_migrated_search_triggers_match_create_all(app, tmp_path, revision):
+    database = tmp_path / 'app.db'
+    flask_db(database, 'upgrade', revision)
+    with sqlite3.connect(database) as connection:
+        migrated = search_schema(connection)
+
+    created = search_schema(db.session.connection().connection.dbapi_connection)
+    assert len(created) == 13
+    assert migrated == created
@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import select, update
+from models import db, Game, PlayerGame
+
+
+def walk(client, url, field):
+    """Every ``field`` of a listing, following X-Next-Cursor from page to page."""
+    ids, cursor = [], None
+    while True:
+        response = client.get(url + (f'&cursor={cursor}' if cursor else ''))
+        assert response.status_code == 200
+        ids += [row[field] for row in response.get_json()]
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            return ids
+
+
+@pytest.fixture
+def with_nulls(generate):
+    generate(games=60, players=20, reviews=300)
+    # Some NULL sort values, which SQLite orders before every other value
+    db.session.execute(update(Game).where(Game.game_id % 7 == 0).values(release_year=None))
+    db.session.execute(update(PlayerGame).where(PlayerGame.id % 9 == 0).values(rating=None))
+    db.session.commit()
+
+
+@pytest.mark.parametrize('url, sort, key', [
+    ('/games?limit=7&fields=game_id&sort=release_year', Game.release_year, Game.game_id),
+    ('/games?limit=7&fields=game_id&sort=-release_year', Game.release_year, Game.game_id),
+    ('/games?limit=7&fields=game_id&sort=title', Game.title, Game.game_id),
+    ('/games?limit=7&fields=game_id&sort=-category_id', Game.category_id, Game.game_id),
+    ('/player_games?limit=11&fields=id&sort=rating', PlayerGame.rating, PlayerGame.id),
+    ('/player_games?limit=11&fields=id&sort=-rating', PlayerGame.rating, PlayerGame.id),
+    ('/player_games?limit=11&fields=id&sort=-game_id', PlayerGame.game_id, PlayerGame.id),
+])
+def test_cursor_walk_matches_order_by(client, with_nulls, url, sort, key):
+    descending = '=-' in url
+    order = (sort.desc(), key.desc()) if descending else (sort, key)
+    expected = db.session.scalars(select(key).order_by(*order)).all()
+
+    assert walk(client, url, key.key) == expected
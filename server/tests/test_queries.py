@@ -0,0 +1,40 @@
+import pytest
+
+# Pages are larger than the small dataset and smaller than the large one, so a
+# query per row would show up as a count that grows with the data
+URLS = [
+    '/games?limit=50',
+    '/games?limit=50&sort=title',
+    '/player_games?limit=50',
+    '/player_games?limit=50&sort=-rating',
+    '/players?limit=50',
+    '/players/1/games?limit=50',
+]
+
+
+def statements_per_url(client, count_statements):
+    counts = {}
+    for url in URLS:
+        with count_statements() as statements:
+            response = client.get(url)
+        assert response.status_code == 200, url
+        counts[url] = len(statements)
+    return counts
+
+
+@pytest.fixture
+def uncached(app):
+    from app import response_cache
+    response_cache.enabled = False
+
+
+def test_listing_statement_counts_do_not_grow_with_rows(uncached, client, generate, count_statements):
+    generate(games=5, players=5, reviews=10)
+    small = statements_per_url(client, count_statements)
+
+    generate(games=200, players=200, reviews=2000)
+    large = statements_per_url(client, count_statements)
+
+    assert large == small
+    # One for the page, plus the table versions behind the ETag
+    assert max(large.values()) <= 2
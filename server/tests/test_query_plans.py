@@ -0,0 +1,55 @@
+import pytest
+from models import db
+
+
+def page_query_plan(client, count_statements, url):
+    """EXPLAIN QUERY PLAN details of the last statement ``url`` runs."""
+    with count_statements(parameters=True) as statements:
+        assert client.get(url).status_code == 200, url
+    statement, parameters = statements[-1]
+    rows = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)
+    return [detail for _, _, _, detail in rows]
+
+
+@pytest.mark.parametrize('url, index', [
+    ('/games?category_id=1', 'ix_games_category_id_game_id'),
+    ('/players?country_id=1', 'ix_players_country_id_player_id'),
+    ('/player_games?game_id=1', 'ix_player_games_game_id_id'),
+    ('/player_games?player_id=1', 'ix_player_games_player_id_id'),
+    ('/player_games?player_id=1&sort=-rating', 'ix_player_games_player_id_rating_id'),
+    ('/players/1/games', 'ix_player_games_player_id_id'),
+    ('/players/1/games?sort=rating', 'ix_player_games_player_id_rating_id'),
+    ('/categories/1', 'ix_games_category_id_game_id'),
+    ('/countries/1', 'ix_players_country_id_player_id'),
+])
+def test_foreign_key_filters_search_their_index(client, generate, count_statements, url, index):
+    generate(games=50, players=50, reviews=500)
+    plan = page_query_plan(client, count_statements, url)
+    assert any(index in detail for detail in plan), plan
+    assert not any(detail.startswith('SCAN') or 'TEMP B-TREE' in detail for detail in plan), plan
+
+
+@pytest.mark.parametrize('url, index', [
+    ('/player_games?country_id=1&sort=-rating', 'ix_player_games_rating_id'),
+    ('/player_games?country_id=1&sort=game_id', 'ix_player_games_game_id_id'),
+])
+def test_country_filter_walks_the_sort_order(client, generate, count_statements, url, index):
+    # Reviews are read in page order and checked against the country's players, never sorted
+    generate(games=50, players=50, reviews=500)
+    plan = page_query_plan(client, count_statements, url)
+    assert any(index in detail for detail in plan), plan
+    assert not any('TEMP B-TREE' in detail for detail in plan), plan
+
+
+@pytest.mark.parametrize('url, index', [
+    ('/games?limit=5&sort=title', 'ix_games_title_game_id'),
+    ('/games?limit=5&sort=-release_year', 'ix_games_release_year_game_id'),
+    ('/player_games?limit=5&sort=rating', 'ix_player_games_rating_id'),
+    ('/player_games?limit=5&sort=-rating', 'ix_player_games_rating_id'),
+])
+def test_next_pages_seek_their_sort_index(client, generate, count_statements, url, index):
+    generate(games=50, players=50, reviews=500)
+    cursor = client.get(url).headers['X-Next-Cursor']
+    plan = page_query_plan(client, count_statements, f'{url}&cursor={cursor}')
+    assert any(index in detail for detail in plan), plan
+    assert not any(detail.startswith('SCAN') or 'TEMP B-TREE' in detail for detail in plan), plan
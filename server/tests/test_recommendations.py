@@ -0,0 +1,61 @@
+from models import db, Category, Country, Game, Player, PlayerGame
+import numpy as np
+import pytest
+from recommendations import load_ratings, build_arrays, write_model, read_meta, Model
+
+# Past 2**53 a float64 no longer holds every integer
+BIG_ID = 2 ** 53 + 1
+
+
+def test_load_ratings_keeps_large_ids_exact(app):
+    db.session.add_all([Country(country_id=1, country_name='Chile'), Category(category_id=1, category_name='Puzzle')])
+    db.session.add_all([
+        Player(player_id=BIG_ID, username='far', email='far@example.com', country_id=1),
+        Game(game_id=BIG_ID + 2, title='Far', category_id=1),
+    ])
+    db.session.add(PlayerGame(player_id=BIG_ID, game_id=BIG_ID + 2, rating=4.5))
+    db.session.commit()
+
+    player_ids, game_ids, ratings, watermark = load_ratings(db.session)
+    assert player_ids.tolist() == [BIG_ID]
+    assert game_ids.tolist() == [BIG_ID + 2]
+    assert ratings.tolist() == [4.5]
+
+
+# Players 1 and 2 rate games 10 and 20 alike and 30 apart; player 3 the other way round
+RATINGS = ([1, 1, 1, 2, 2, 2, 3, 3, 3, 4, 4],
+           [10, 20, 30, 10, 20, 30, 10, 20, 30, 10, 40],
+           [5, 5, 1, 5, 4, 1, 1, 1, 5, 4, 2])
+
+
+@pytest.fixture
+def model(tmp_path):
+    write_model(tmp_path, build_arrays(*RATINGS, neighbors=2), {})
+    return Model(*read_meta(tmp_path))
+
+
+def test_build_arrays_keeps_positive_neighbours_only():
+    arrays = build_arrays(*RATINGS, neighbors=2)
+    assert arrays['game_ids'].tolist() == [10, 20, 30, 40]
+    assert arrays['neighbors'][:, 0].tolist() == [1, 0, -1, -1]
+    assert arrays['weights'][0, 0] == arrays['weights'][1, 0] > 0
+    assert arrays['popular'][:2].tolist() == [0, 1]
+
+
+def test_build_arrays_gives_the_same_model_for_any_block_memory():
+    whole = build_arrays(*RATINGS, neighbors=2)
+    # One column at a time
+    blocked = build_arrays(*RATINGS, neighbors=2, block_memory=1)
+    for name, array in whole.items():
+        np.testing.assert_array_equal(blocked[name], array, err_msg=name)
+
+
+def test_recommend_scores_unseen_neighbours(model):
+    (game_id, score), = model.recommend([10, 30], [5, 1], 5)
+    assert game_id == 20
+    assert score == pytest.approx(5, abs=0.01)
+
+
+def test_recommend_falls_back_to_popular_games(model):
+    assert model.recommend([], [], 2) == [(10, None), (20, None)]
+    assert model.recommend([99], [3], 2) == [(10, None), (20, None)]
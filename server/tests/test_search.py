@@ -0,0 +1,54 @@
+import pytest
+from models import db, Category, Country, Game, Player, PlayerGame
+
+
+@pytest.fixture
+def catalog(app):
+    db.session.add_all([Country(country_id=1, country_name='Chile'),
+                        Category(category_id=1, category_name='Puzzle'),
+                        Category(category_id=2, category_name='Racing')])
+    db.session.add_all([Game(game_id=1, title='Portal', category_id=1),
+                        Game(game_id=2, title='Portal Racer', category_id=2),
+                        Player(player_id=1, username='portalfan', email='fan@example.com', country_id=1)])
+    db.session.add(PlayerGame(id=1, player_id=1, game_id=1, review='<script>alert(1)</script> great puzzles'))
+    db.session.commit()
+
+
+def hits(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['results']
+
+
+def test_every_kind_is_found_by_prefix(client, catalog):
+    found = {(hit['type'], hit['id']) for hit in hits(client, '/search?q=port')}
+    assert found == {('game', 1), ('game', 2), ('player', 1)}
+    assert [hit['id'] for hit in hits(client, '/search?q=puzzle&type=category')] == [1]
+
+
+def test_matches_are_highlighted(client, catalog):
+    assert hits(client, '/search?q=racer')[0]['text'] == 'Portal <b>Racer</b> Racing'
+
+
+def test_markup_in_user_text_is_escaped(client, catalog):
+    review, = hits(client, '/search?q=great&type=review')
+    assert review['text'] == '&lt;script&gt;alert(1)&lt;/script&gt; <b>great</b> puzzles'
+
+
+def test_renaming_a_category_reindexes_its_games(client, catalog):
+    db.session.get(Category, 2).category_name = 'Kart'
+    db.session.commit()
+    assert [hit['id'] for hit in hits(client, '/search?q=kart&type=game')] == [2]
+    assert hits(client, '/search?q=racing') == []
+
+
+def test_results_are_paged_with_a_cursor(client, catalog):
+    first = client.get('/search?q=port&limit=2')
+    assert len(first.get_json()['results']) == 2
+    rest = hits(client, f"/search?q=port&limit=2&cursor={first.headers['X-Next-Cursor']}")
+    assert len(rest) == 1
+
+
+@pytest.mark.parametrize('url', ['/search', '/search?q=%20', '/search?q=portal&type=genre'])
+def test_bad_queries_are_rejected(client, catalog, url):
+    assert client.get(url).status_code == 400
@@ -0,0 +1,72 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs the app's test client on requests read from stdin, one JSON array per line
+APP_PROCESS = '''
+import json, sys
+from app import app
+client = app.test_client()
+for line in sys.stdin:
+    method, url, body, etag = json.loads(line)
+    response = client.open(url, method=method, json=body, headers={'If-None-Match': etag} if etag else {})
+    print('RESULT', json.dumps({'status': response.status_code, 'etag': response.headers.get('ETag'),
+                                'cache': response.headers.get('X-Cache'), 'body': response.get_json(silent=True)}),
+          flush=True)
+'''
+
+
+class AppProcess:
+    """The app in its own process, like one gunicorn worker, on a shared database file."""
+
+    def __init__(self, database):
+        env = {**os.environ, 'DB_URI': f'sqlite:///{database}', 'CACHE_ENABLED': '1'}
+        self.process = subprocess.Popen([sys.executable, '-c', APP_PROCESS], cwd=SERVER_DIR, env=env,
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+
+    def request(self, method, url, body=None, etag=None):
+        self.process.stdin.write(json.dumps([method, url, body, etag]) + '\n')
+        self.process.stdin.flush()
+        for line in self.process.stdout:
+            if line.startswith('RESULT '):
+                return json.loads(line[len('RESULT '):])
+        raise RuntimeError('app process exited')
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait(10)
+
+
+@pytest.fixture
+def workers(tmp_path):
+    database = tmp_path / 'app.db'
+    env = {**os.environ, 'DB_URI': f'sqlite:///{database}'}
+    subprocess.run([sys.executable, '-c', 'import seed; seed.seed_database()'], cwd=SERVER_DIR, env=env,
+                   check=True, capture_output=True)
+    processes = [AppProcess(database), AppProcess(database)]
+    yield processes
+    for process in processes:
+        process.close()
+
+
+def test_write_in_one_worker_changes_etag_and_body_in_another(workers):
+    reader, writer = workers
+    first = reader.request('GET', '/games')
+    assert reader.request('GET', '/games')['cache'] == 'HIT'
+
+    created = writer.request('POST', '/games', {'title': 'Portal', 'category_id': 1})
+    assert created['status'] == 200
+
+    # The reader's cached body was built before the write; it must not be sent again
+    after = reader.request('GET', '/games', etag=first['etag'])
+    assert after['status'] == 200
+    assert after['etag'] != first['etag']
+    assert 'Portal' in [game['title'] for game in after['body']]
+
+    again = reader.request('GET', '/games', etag=after['etag'])
+    assert again['status'] == 304
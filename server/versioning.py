@@ -0,0 +1,127 @@
+import functools
+import hashlib
+from datetime import datetime, timedelta, timezone
+from flask import Response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import db, TableVersion, cascaded_tables
+from json_provider import to_response
+from streaming import wants_stream
+
+
+@event.listens_for(Session, 'before_flush')
+def _bump_table_versions(session, flush_context, instances):
+    """Bump the version of every table this flush writes to."""
+    changed = [*session.new, *session.deleted,
+               *(obj for obj in session.dirty if session.is_modified(obj))]
+    tables = {obj.__tablename__ for obj in changed if not isinstance(obj, TableVersion)}
+    # Rows ON DELETE CASCADE removes change their tables too, and removed reviews change game ratings
+    cascaded = cascaded_tables(obj.__tablename__ for obj in session.deleted) - tables
+    if 'player_games' in cascaded:
+        cascaded.add('games')
+    tables |= cascaded
+    if tables:
+        bump_table_versions(session, tables)
+
+
+def bump_table_versions(session, tables):
+    """Bump ``tables`` for writes that bypass the ORM, such as bulk inserts."""
+    tables = set(tables)
+    now = _now().replace(tzinfo=None)
+    result = session.execute(
+        db.update(TableVersion)
+        .where(TableVersion.table_name.in_(tables))
+        .values(version=TableVersion.version + 1, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount < len(tables):
+        existing = set(session.scalars(
+            db.select(TableVersion.table_name).where(TableVersion.table_name.in_(tables))))
+        session.execute(db.insert(TableVersion), [
+            {'table_name': name, 'version': 1, 'updated_at': now} for name in tables - existing
+        ])
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def versions_query(tables):
+    return (db.select(TableVersion.table_name, TableVersion.version, TableVersion.updated_at)
+            .where(TableVersion.table_name.in_(tables)))
+
+
+def request_versions():
+    """``{tables: versions_query rows}`` read so far in this request."""
+    return request.environ.setdefault('app.table_versions', {})
+
+
+def table_versions(tables):
+    """``versions_query`` rows for ``tables``, read at most once per request."""
+    read = request_versions()
+    if tables not in read:
+        read[tables] = db.session.execute(versions_query(tables)).all()
+    return read[tables]
+
+
+def versions_token(rows, tables):
+    """``games=3;categories=1`` for ``versions_query`` rows, in ``tables`` order."""
+    versions = {name: version for name, version, _ in rows}
+    return ';'.join(f'{name}={versions.get(name, 0)}' for name in tables)
+
+
+def validators(rows, tables):
+    """ETag and Last-Modified for the current request from ``versions_query`` rows.
+
+    Last-Modified has whole seconds, so a write later in the same second
+    would carry the same value. It is left out (None) until that second is
+    over; until then clients revalidate with the ETag alone.
+    """
+    token = versions_token(rows, tables)
+    etag = hashlib.sha1(f'{token};{request.full_path}'.encode()).hexdigest()
+    last_modified = max((updated_at for _, _, updated_at in rows), default=None)
+    if last_modified is not None:
+        last_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+        if _now() < last_modified + timedelta(seconds=1):
+            last_modified = None
+    return etag, last_modified
+
+
+def not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    since = request.if_modified_since
+    return since is not None and last_modified is not None and last_modified <= since
+
+
+def set_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
+
+
+def conditional(*tables):
+    """Answer ``If-None-Match``/``If-Modified-Since`` from the versions of ``tables``.
+
+    The ETag is derived from the table versions and the request URL, so an
+    unchanged resource gets a 304 without running the handler or serializing.
+    The versions are the ones ``ResponseCache.cached`` keys the body on, so a
+    cached body is never sent under an ETag for other versions.
+    """
+    def decorator(get):
+        @functools.wraps(get)
+        def wrapper(resource, *args, **kwargs):
+            if wants_stream():
+                return get(resource, *args, **kwargs)
+
+            etag, last_modified = validators(table_versions(tables), tables)
+            if not_modified(etag, last_modified):
+                response = Response(status=304)
+            else:
+                response = to_response(get(resource, *args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+            return set_validators(response, etag, last_modified)
+        return wrapper
+    return decorator
@@ -0,0 +1,14 @@
+"""Production entry point.
+
+    cd server && gunicorn wsgi:app
+
+gunicorn picks up gunicorn.conf.py from the working directory; workers and
+threads are set there (WEB_CONCURRENCY, GUNICORN_THREADS).
+"""
+from app import app
+
+application = app
+
+if __name__ == "__main__":
+    from werkzeug.serving import run_simple
+    run_simple("0.0.0.0", 5555, app, threaded=True)